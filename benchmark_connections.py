@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for idle TCP client connections
+
+Creates idle TCPConnection objects with their line framers (state only, no
+sockets or threads) and reports the memory allocated per connection, as measured by tracemalloc.
+
+Usage: python benchmark_connections.py [clients]
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from connection import TCPConnection
+from constants import MAX_LINE_SIZE
+from framing import LineFramer
+
+class IdleSocket:
+    """Stand-in for an accepted client socket"""
+
+    def getsockname(self):
+        return ("127.0.0.1", 8016)
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    log_path = tempfile.mkdtemp(prefix="crs_benchmark_")
+    client_socket = IdleSocket()
+
+    # Create one connection first so shared state (logger, imports) is not counted
+    TCPConnection(client_socket, ("10.0.0.1", 40000), log_path)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+
+    connections = []
+    for index in range(clients):
+        connection = TCPConnection(client_socket, ("10.0.0.1", 40000 + index % 20000), log_path)
+        connection.client_id = str(index)
+        connections.append((connection, LineFramer(MAX_LINE_SIZE)))
+
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = after - before
+    print(f"Idle connections: {clients}")
+    print(f"Total memory:     {total / 1024 / 1024:.2f} MiB (peak {peak / 1024 / 1024:.2f} MiB)")
+    print(f"Per connection:   {total / clients:.0f} bytes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Connection admission control for Cloud Report Server
+"""
+
+import socket
+import struct
+import threading
+import time
+from typing import Dict, Optional
+
+class ConnectionLimit:
+    """Server-wide cap on open connections, shared by the admission controllers of all interfaces"""
+
+    def __init__(self, max_connections: int = 0):
+        """
+        Initialize the connection limit
+
+        Args:
+            max_connections: Maximum number of open connections (0 = unlimited)
+        """
+        self.max_connections = max_connections
+        self.lock = threading.Lock()
+        self.active = 0
+
+    def try_acquire(self) -> bool:
+        """
+        Take a connection slot
+
+        Returns:
+            True if a slot was taken (call release() when the connection closes)
+        """
+        with self.lock:
+            if self.max_connections and self.active >= self.max_connections:
+                return False
+            self.active += 1
+            return True
+
+    def release(self) -> None:
+        """Return a connection slot"""
+        with self.lock:
+            self.active -= 1
+
+class AdmissionController:
+    """
+    Admission control for the incoming TCP connections of one interface
+
+    A token bucket limits the accept rate: when it is empty the accept
+    loop waits (the connection is deferred and stays in the listen
+    backlog). Connections over the server-wide or per-IP cap are rejected
+    with a reset before any per-connection state is created.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 0,
+        max_connections_per_ip: int = 0,
+        accept_rate: float = 0,
+        accept_burst: int = 0,
+        connection_limit: Optional[ConnectionLimit] = None,
+    ):
+        """
+        Initialize the admission controller
+
+        Args:
+            max_connections: Maximum number of open connections, if no connection_limit is given (0 = unlimited)
+            max_connections_per_ip: Maximum number of open connections per source IP (0 = unlimited)
+            accept_rate: Connections accepted per second (0 = unlimited)
+            accept_burst: Connections accepted at once before accept_rate applies
+            connection_limit: Server-wide connection cap shared with other interfaces
+        """
+        self.connection_limit = connection_limit or ConnectionLimit(max_connections)
+        self.max_connections_per_ip = max_connections_per_ip
+        self.accept_rate = accept_rate
+        self.accept_burst = max(accept_burst, 1)
+
+        self.lock = threading.Lock()
+        self.tokens = float(self.accept_burst)
+        self.last_refill = time.monotonic()
+
+        self.active = 0
+        self.active_per_ip: Dict[str, int] = {}
+
+        self.accepted = 0
+        self.deferred = 0
+        self.rejected = 0
+
+    def acquire_delay(self) -> float:
+        """
+        Take an accept token
+
+        Returns:
+            0 if a token was taken, otherwise seconds until the next token;
+            the caller waits and calls again, and calls record_deferred()
+            once for the connection it waits for
+        """
+        if self.accept_rate <= 0:
+            return 0
+
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.accept_burst, self.tokens + (now - self.last_refill) * self.accept_rate)
+            self.last_refill = now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+
+            return (1 - self.tokens) / self.accept_rate
+
+    def record_deferred(self) -> None:
+        """Count a connection that had to wait for an accept token"""
+        with self.lock:
+            self.deferred += 1
+
+    def try_admit(self, ip: str) -> bool:
+        """
+        Admit a connection if it is within the server-wide and per-IP caps
+
+        Args:
+            ip: Source IP address
+
+        Returns:
+            True if admitted (call release() when it closes), False if rejected
+        """
+        with self.lock:
+            ip_count = self.active_per_ip.get(ip, 0)
+
+            if (
+                self.max_connections_per_ip and ip_count >= self.max_connections_per_ip
+            ) or not self.connection_limit.try_acquire():
+                self.rejected += 1
+                return False
+
+            self.active += 1
+            self.active_per_ip[ip] = ip_count + 1
+            self.accepted += 1
+            return True
+
+    def release(self, ip: str) -> None:
+        """
+        Release an admitted connection
+
+        Args:
+            ip: Source IP address
+        """
+        with self.lock:
+            self.active -= 1
+            ip_count = self.active_per_ip.get(ip, 0) - 1
+            if ip_count > 0:
+                self.active_per_ip[ip] = ip_count
+            else:
+                self.active_per_ip.pop(ip, None)
+            self.connection_limit.release()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get admission counters
+
+        Returns:
+            Dictionary with active, accepted, deferred and rejected counts
+        """
+        with self.lock:
+            return {
+                "Active": self.active,
+                "Accepted": self.accepted,
+                "Deferred": self.deferred,
+                "Rejected": self.rejected,
+            }
+
+def reject_socket(client_socket: socket.socket) -> None:
+    """
+    Close a socket with a reset instead of a graceful shutdown
+
+    The server keeps no TIME_WAIT state and sends nothing but the RST.
+
+    Args:
+        client_socket: Socket to reject
+    """
+    try:
+        client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+    except OSError:
+        pass
+    finally:
+        client_socket.close()
@@ -0,0 +1,313 @@
+"""
+Asyncio TCP server implementation for Cloud Report Server
+"""
+
+import asyncio
+import socket
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from admission import AdmissionController
+from auth_client import AuthClient
+from constants import LINE_SEPARATOR, MAX_LINE_SIZE
+from connection import TCPConnection, TCPCommandHandler
+from error_log import ErrorLogSink
+from framing import Frame
+from tcp_server import TcpServer
+
+class AsyncTCPConnection(TCPConnection):
+    """TCP connection served by an asyncio stream instead of a blocking socket"""
+    
+    __slots__ = ("writer", "loop")
+
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        loop: asyncio.AbstractEventLoop,
+        address: Tuple[str, int],
+        log_path: str,
+        max_pending_requests: int = 8,
+        max_in_flight_requests: int = 1,
+    ):
+        self.writer = writer
+        self.loop = loop
+        super().__init__(
+            writer.get_extra_info("socket"),
+            address,
+            log_path,
+            max_pending_requests,
+            max_in_flight_requests,
+        )
+
+    def write(self, data: bytes) -> None:
+        """Queue raw bytes on the transport from any thread"""
+        self.loop.call_soon_threadsafe(self.writer.write, data)
+
+    def close(self) -> None:
+        """Close the transport from any thread"""
+        try:
+            self.loop.call_soon_threadsafe(self.writer.close)
+        except RuntimeError:
+            # Event loop is already closed
+            pass
+    
+    def shutdown(self) -> None:
+        """Close the transport, ending the connection task"""
+        self.close()
+
+class AsyncTcpServer(TcpServer):
+    """
+    TCP server running all client connections on a single asyncio event loop
+
+    Idle connections cost a coroutine instead of an OS thread. Commands are
+    still processed by TCPCommandHandler, in order per connection, on a
+    bounded worker pool because some of them (INFO) block on the auth server.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        log_path: str,
+        auth_server_url: str,
+        max_pending_requests: int = 8,
+        max_in_flight_requests: int = 1,
+        max_line_size: int = MAX_LINE_SIZE,
+        auth_client: Optional[AuthClient] = None,
+        admission: Optional[AdmissionController] = None,
+        backlog: int = 128,
+        error_sink: Optional[ErrorLogSink] = None,
+        trace_log_enabled: bool = False,
+        workers: int = 32,
+    ):
+        """
+        Initialize the asyncio TCP server
+
+        Args:
+            host: Host to bind to
+            port: Port to bind to
+            log_path: Path to log files
+            auth_server_url: URL of the authentication server
+            max_pending_requests: Report requests queued per client before rejecting
+            max_in_flight_requests: Report requests sent to a client before waiting for SRSP
+            max_line_size: Maximum length of a command line in bytes
+            auth_client: Shared authentication server client (created from auth_server_url if not given)
+            admission: Admission control for new connections (unlimited if not given)
+            backlog: Listen backlog of the server socket
+            error_sink: Sink for client ERRL messages (default limits if not given)
+            trace_log_enabled: Whether command timings are written to TraceLog_Server.txt
+            workers: Number of worker threads processing commands
+        """
+        super().__init__(
+            host,
+            port,
+            log_path,
+            auth_server_url,
+            max_pending_requests,
+            max_in_flight_requests,
+            max_line_size,
+            auth_client,
+            admission,
+            backlog,
+            error_sink,
+            trace_log_enabled,
+        )
+        self.workers = workers
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    def start(self) -> None:
+        """Start the event loop thread and the asyncio TCP server"""
+        if self.running:
+            return
+
+        self.running = True
+
+        try:
+            self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="tcp-worker")
+            self.loop = asyncio.new_event_loop()
+
+            # Start event loop thread
+            self.server_thread = threading.Thread(target=self._run_loop)
+            self.server_thread.daemon = True
+            self.server_thread.start()
+
+            # Bind and listen on the loop, propagating bind errors to the caller
+            self.logger.log(f"Binding async TCP server to {self.host}:{self.port}")
+            future = asyncio.run_coroutine_threadsafe(self._start_server(), self.loop)
+            future.result()
+
+            self.reaper.start()
+
+            self.logger.log(f"Async TCP server started on {self.host}:{self.port} with {self.workers} workers")
+
+        except Exception as e:
+            self.running = False
+            self._stop_loop()
+            error_msg = f"Failed to start async TCP server on {self.host}:{self.port}: {e}"
+            self.logger.log(error_msg)
+            print(error_msg, file=sys.stderr)
+            print(traceback.format_exc(), file=sys.stderr)
+            raise
+
+    def stop(self) -> None:
+        """Stop the asyncio TCP server"""
+        if not self.running:
+            return
+
+        super().stop()
+        self._stop_loop()
+
+    def _run_loop(self) -> None:
+        """Run the event loop until stopped"""
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def _stop_loop(self) -> None:
+        """Close the listening socket, stop the event loop and the worker pool"""
+        if self.loop and self.loop.is_running():
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout=5)
+            except Exception as e:
+                self.logger.log(f"Error shutting down async TCP server: {e}")
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+        if self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    async def _start_server(self) -> None:
+        """Create the listening server on the event loop"""
+        self.server = await asyncio.start_server(
+            self._handle_stream,
+            self.host,
+            self.port,
+            reuse_address=True,
+            backlog=self.backlog,
+            limit=self.max_line_size,
+        )
+
+    async def _shutdown(self) -> None:
+        """Stop listening and cancel all client connection tasks"""
+        if self.server:
+            self.server.close()
+            self.server = None
+
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _process_line(self, line: bytes, handler: TCPCommandHandler) -> str:
+        """
+        Parse and process a command line on a worker thread
+
+        Args:
+            line: Command line without separator
+            handler: Command handler
+
+        Returns:
+            Response string
+        """
+        return self._process_command(Frame(line.decode('utf-8')), handler)
+
+    async def _handle_stream(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Handle a client connection
+
+        Args:
+            reader: Stream reader for the client
+            writer: Stream writer for the client
+        """
+        address = writer.get_extra_info("peername")[:2]
+        connection = None
+
+        # Reject over the connection caps before creating any state
+        if not self.admission.try_admit(address[0]):
+            writer.transport.abort()
+            return
+
+        self.logger.log(f"New client connection from {address[0]}:{address[1]}")
+
+        try:
+            # Over the accept rate, defer the connection before reading its INIT
+            delay = self.admission.acquire_delay()
+            if delay:
+                self.admission.record_deferred()
+            while delay:
+                await asyncio.sleep(delay)
+                delay = self.admission.acquire_delay()
+
+            sock = writer.get_extra_info("socket")
+            if sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            # Create connection object and command handler
+            connection = AsyncTCPConnection(
+                writer,
+                self.loop,
+                address,
+                self.log_path,
+                self.max_pending_requests,
+                self.max_in_flight_requests,
+            )
+            self.reaper.add(connection)
+            handler = TCPCommandHandler(
+                connection, self.auth_server_url, self.auth_client, self.error_sink, self.trace_logger
+            )
+            separator = LINE_SEPARATOR.encode('utf-8')
+
+            while not connection.must_disconnect and self.running:
+                try:
+                    line = await reader.readuntil(separator)
+                except asyncio.IncompleteReadError:
+                    # Client disconnected
+                    break
+                except asyncio.LimitOverrunError:
+                    self.logger.log(
+                        f"Dropping client {address[0]}:{address[1]}: line exceeds {self.max_line_size} bytes"
+                    )
+                    break
+
+                # Parse and process the command on the worker pool, keeping per-connection order
+                response = await self.loop.run_in_executor(
+                    self.executor, self._process_line, line[:-len(separator)], handler
+                )
+
+                # Send response
+                writer.write(f"{response}{LINE_SEPARATOR}".encode('utf-8'))
+                await writer.drain()
+
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+
+        except Exception as e:
+            # Log error
+            error_msg = f"Error handling client {address[0]}:{address[1]}: {e}"
+            self.logger.log(error_msg)
+            print(error_msg, file=sys.stderr)
+            print(traceback.format_exc(), file=sys.stderr)
+
+        finally:
+            # Clean up connection
+            try:
+                writer.close()
+            except Exception:
+                pass
+
+            # Remove from connections list if it was added
+            if connection:
+                connection.on_disconnect()
+                self._unregister_connection(connection)
+
+            self.admission.release(address[0])
+
+            # Log disconnection
+            self.logger.log(f"Client disconnected from {address[0]}:{address[1]}")
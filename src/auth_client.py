@@ -0,0 +1,160 @@
+"""
+Authentication server client for Cloud Report Server
+"""
+
+import datetime
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import auth_request_duration
+
+class AuthServerError(Exception):
+    """Raised when the authentication server cannot be queried"""
+
+class AuthClient:
+    """
+    Client for the authentication server REST API (dreport/api.php)
+
+    All connections of a TCP server share one keep-alive session with a
+    bounded connection pool. At most max_concurrent requests run at once,
+    and successful objectinfo results are cached per objectid+hostname, so
+    a reconnect storm does not open one HTTP connection per device.
+    """
+
+    def __init__(
+        self,
+        rest_url: str,
+        max_concurrent: int = 8,
+        cache_ttl: int = 300,
+        timeout: int = 10,
+        cache_size: int = 10000,
+    ):
+        """
+        Initialize the authentication server client
+
+        Args:
+            rest_url: Base URL of the authentication server
+            max_concurrent: Maximum number of concurrent requests
+            cache_ttl: Seconds an objectinfo result is reused (0 disables caching)
+            timeout: Request timeout in seconds
+            cache_size: Maximum number of cached objectinfo results
+        """
+        self.rest_url = rest_url
+        self.max_concurrent = max_concurrent
+        self.cache_ttl = cache_ttl
+        self.timeout = timeout
+        self.cache_size = cache_size
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrent)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.semaphore = threading.BoundedSemaphore(max_concurrent)
+
+        # (objectid, hostname) -> (monotonic expiry time, result), least recently used first
+        self.cache: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.cache_lock = threading.Lock()
+
+    def get_object_info(self, params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Get object information, from the cache when possible
+
+        Args:
+            params: objectinfo query parameters (objectid, hostname, ...)
+
+        Returns:
+            Parsed JSON result of the authentication server
+
+        Raises:
+            AuthServerError: If the server is busy, unreachable or answers with an HTTP error
+        """
+        key = (params.get("objectid", ""), params.get("hostname", ""))
+
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached
+
+        # Wait for a free slot, as long as the request itself may take
+        if not self.semaphore.acquire(timeout=self.timeout):
+            raise AuthServerError("Too many concurrent authentication server requests")
+
+        try:
+            # Another thread may have fetched it while we waited
+            cached = self._get_cached(key)
+            if cached is not None:
+                return cached
+
+            start = time.perf_counter()
+            try:
+                response = self.session.get(f"{self.rest_url}/objectinfo", params=params, timeout=self.timeout)
+            except requests.RequestException:
+                auth_request_duration.observe(time.perf_counter() - start, "error")
+                raise
+            auth_request_duration.observe(time.perf_counter() - start, str(response.status_code))
+        except requests.RequestException as e:
+            raise AuthServerError(str(e))
+        finally:
+            self.semaphore.release()
+
+        if response.status_code != 200:
+            raise AuthServerError(f"HTTP error: {response.status_code}")
+
+        try:
+            result = response.json()
+        except ValueError as e:
+            raise AuthServerError(f"Invalid JSON response: {e}")
+
+        if result.get("result") == 0:
+            self._store(key, result)
+
+        return result
+
+    def _get_cached(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        """Get a cached result that has not expired"""
+        with self.cache_lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                return None
+
+            expires, result = entry
+            if time.monotonic() >= expires:
+                del self.cache[key]
+                return None
+
+            self.cache.move_to_end(key)
+            return result
+
+    def _store(self, key: Tuple[str, str], result: Dict[str, Any]) -> None:
+        """Cache a result until the TTL passes or its expiredate is reached, evicting the least recently used over cache_size"""
+        if self.cache_ttl <= 0:
+            return
+
+        ttl = float(self.cache_ttl)
+
+        expire_str = result.get("expiredate", "")
+        if expire_str:
+            try:
+                # Format: YYYY-MM-DD, valid through the end of that day
+                expire_date = datetime.datetime.strptime(expire_str, "%Y-%m-%d") + datetime.timedelta(days=1)
+                ttl = min(ttl, (expire_date - datetime.datetime.now()).total_seconds())
+            except ValueError:
+                pass
+
+        if ttl <= 0:
+            return
+
+        with self.cache_lock:
+            self.cache[key] = (time.monotonic() + ttl, result)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def close(self) -> None:
+        """Close the pooled HTTP connections"""
+        self.session.close()
@@ -74,15 +74,46 @@ class ServerConfig:
         http_section = f"SRV_{server_num}_HTTP"
         settings["http_interface"] = self.get_str(http_section, "HTTP_IPInterface", "0.0.0.0")
         settings["http_port"] = self.get_int(http_section, "HTTP_Port", 8080)
+        settings["http_workers"] = self.get_int(http_section, "HTTP_Workers", 16)
+        settings["http_queue_size"] = self.get_int(http_section, "HTTP_QueueSize", 64)
+        settings["report_timeout"] = self.get_int(http_section, "HTTP_ReportTimeout", 60)
+        settings["report_cache_ttl"] = self.get_int(http_section, "HTTP_ReportCacheTTL", 0)
+        settings["report_cache_size"] = self.get_int(http_section, "HTTP_ReportCacheSize", 64 * 1024 * 1024)
+        settings["compression_level"] = self.get_int(http_section, "HTTP_CompressionLevel", 6)
+        settings["compression_threshold"] = self.get_int(http_section, "HTTP_CompressionThreshold", 1024)
+        settings["auth_max_failures"] = self.get_int(http_section, "HTTP_AuthMaxFailures", 5)
+        settings["auth_max_backoff"] = self.get_int(http_section, "HTTP_AuthMaxBackoff", 300)
+        settings["auth_verified_ttl"] = self.get_int(http_section, "HTTP_AuthCacheTTL", 60)
+        
+        # Report cache TTL per report name
+        report_cache_section = f"SRV_{server_num}_REPORTCACHE"
+        settings["report_cache_ttls"] = {
+            name: self.get_int(report_cache_section, name, 0)
+            for name in self.get_section(report_cache_section)
+        }
         
         # TCP settings
         tcp_section = f"SRV_{server_num}_TCP"
         settings["tcp_interface"] = self.get_str(tcp_section, "TCP_IPInterface", "0.0.0.0")
         settings["tcp_port"] = self.get_int(tcp_section, "TCP_Port", 8016)
+        settings["tcp_mode"] = self.get_str(tcp_section, "TCP_Mode", "thread").lower()
+        settings["tcp_workers"] = self.get_int(tcp_section, "TCP_Workers", 32)
+        settings["max_pending_requests"] = self.get_int(tcp_section, "TCP_MaxPendingRequests", 8)
+        settings["max_in_flight_requests"] = self.get_int(tcp_section, "TCP_MaxInFlightRequests", 1)
+        settings["max_line_size"] = self.get_int(tcp_section, "TCP_MaxLineSize", 16 * 1024 * 1024)
+        settings["tcp_backlog"] = self.get_int(tcp_section, "TCP_Backlog", 128)
+        settings["max_connections_per_ip"] = self.get_int(tcp_section, "TCP_MaxConnectionsPerIP", 0)
+        settings["accept_rate"] = self.get_int(tcp_section, "TCP_AcceptRate", 0)
+        settings["accept_burst"] = self.get_int(tcp_section, "TCP_AcceptBurst", 50)
+        settings["errlog_rate"] = self.get_int(tcp_section, "TCP_ErrLogRate", 10)
+        settings["errlog_burst"] = self.get_int(tcp_section, "TCP_ErrLogBurst", 100)
         
         # Auth server settings
         auth_section = f"SRV_{server_num}_AUTHSERVER"
         settings["auth_server_url"] = self.get_str(auth_section, "REST_URL", "")
+        settings["auth_max_concurrent"] = self.get_int(auth_section, "MaxConcurrentRequests", 8)
+        settings["auth_cache_ttl"] = self.get_int(auth_section, "CacheTTL", 300)
+        settings["auth_timeout"] = self.get_int(auth_section, "Timeout", 10)
         
         # HTTP logins
         login_section = f"SRV_{server_num}_HTTPLOGINS"
@@ -90,6 +121,24 @@ class ServerConfig:
         
         return settings
     
+    def get_log_level(self) -> str:
+        """Get the log level name ([SERVER] LogLevel)"""
+        return self.get_str("SERVER", "LogLevel", "INFO")
+    
+    def get_max_connections(self) -> int:
+        """Get the server-wide cap on open TCP connections ([SERVER] MaxConnections, 0 = unlimited)"""
+        return self.get_int("SERVER", "MaxConnections", 0)
+    
+    def get_log_rotation_settings(self) -> Dict[str, Any]:
+        """Get log rotation and retention settings ([SERVER] section)"""
+        return {
+            "max_size": self.get_int("SERVER", "LogMaxSize", 500 * 1024),
+            "rotate_interval": self.get_int("SERVER", "LogRotateInterval", 0),
+            "compress": self.get_bool("SERVER", "LogCompress", False),
+            "retention_count": self.get_int("SERVER", "LogRetentionCount", 0),
+            "retention_days": self.get_int("SERVER", "LogRetentionDays", 30),
+        }
+    
     def get_registration_info(self) -> Dict[str, str]:
         """Get registration information"""
         return {
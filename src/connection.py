@@ -8,9 +8,10 @@ import random
 import socket
 import threading
 import time
-from typing import Dict, List, Optional, Tuple, Any
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple, Any
 
-import requests
 import sys
 import traceback
 
@@ -28,27 +29,63 @@ from constants import (
     TCP_ERR_FAIL_INIT_CLIENT_ID,
     TCP_ERR_CHECK_UPDATE_ERROR,
 )
+from auth_client import AuthClient, AuthServerError
 from crypto import DataCompressor, generate_client_crypto_key
-from logger import Logger
+from error_log import ErrorLogSink
+from framing import Frame
+from logger import TraceLogger, get_logger
+from metrics import TCP_COMMANDS, tcp_command_duration
+
+def wall_clock(monotonic_time: float) -> datetime.datetime:
+    """
+    Convert a time.monotonic() value to local wall-clock time
+    
+    Args:
+        monotonic_time: Value returned by time.monotonic()
+        
+    Returns:
+        Local time of that moment
+    """
+    return datetime.datetime.now() - datetime.timedelta(seconds=time.monotonic() - monotonic_time)
 
 class ConnectionInfo:
-    """Connection information class"""
+    """
+    Connection information class
+    
+    Times are time.monotonic() values, so they are not affected by clock
+    changes; wall_clock() converts them for display.
+    """
+    
+    __slots__ = (
+        "remote_host",
+        "remote_ip",
+        "remote_port",
+        "local_port",
+        "connect_time",
+        "disconnect_time",
+        "last_action",
+    )
     
     def __init__(self):
         self.remote_host = ""
         self.remote_ip = ""
         self.remote_port = 0
         self.local_port = 0
-        self.connect_time = datetime.datetime.now()
-        self.disconnect_time = None
-        self.last_action = datetime.datetime.now()
+        self.connect_time = time.monotonic()
+        self.disconnect_time: Optional[float] = None
+        self.last_action = self.connect_time
 
 class RemoteConnection:
     """Base class for remote connections"""
     
+    __slots__ = ("log_path", "logger", "last_error", "connection_info", "must_disconnect")
+    
+    # Protocol name shown by connection_info_as_text()
+    protocol = ""
+    
     def __init__(self, log_path: str):
         self.log_path = log_path
-        self.logger = Logger(log_path)
+        self.logger = get_logger(log_path)
         self.last_error = ""
         self.connection_info = ConnectionInfo()
         self.must_disconnect = False
@@ -56,35 +93,115 @@ class RemoteConnection:
     @property
     def connected_time_sec(self) -> int:
         """Get the connected time in seconds"""
-        delta = datetime.datetime.now() - self.connection_info.connect_time
-        return int(delta.total_seconds())
+        return int(time.monotonic() - self.connection_info.connect_time)
     
     @property
     def idle_time_sec(self) -> int:
         """Get the idle time in seconds"""
-        delta = datetime.datetime.now() - self.connection_info.last_action
-        return int(delta.total_seconds())
+        return int(time.monotonic() - self.connection_info.last_action)
     
     def on_connect(self, client_socket: socket.socket, address: Tuple[str, int]):
         """Handle client connection"""
         self.connection_info.remote_ip = address[0]
         self.connection_info.remote_port = address[1]
         self.connection_info.local_port = client_socket.getsockname()[1]
-        self.connection_info.connect_time = datetime.datetime.now()
-        self.connection_info.last_action = datetime.datetime.now()
+        self.connection_info.connect_time = time.monotonic()
+        self.connection_info.last_action = self.connection_info.connect_time
     
     def on_disconnect(self):
         """Handle client disconnection"""
-        self.connection_info.disconnect_time = datetime.datetime.now()
+        self.connection_info.disconnect_time = time.monotonic()
+    
+    def connection_info_as_text(self) -> str:
+        """Get connection information as text"""
+        info = self.connection_info
+        result = f"{self.protocol} Start:{wall_clock(info.connect_time).strftime('%M%S.%f')} "
+        
+        if info.disconnect_time is not None:
+            result += f"End:{wall_clock(info.disconnect_time).strftime('%M%S.%f')} "
+            
+        result += (
+            f"Time:{self.connected_time_sec} "
+            f"RH:{info.remote_ip} "
+            f"R/LP:{info.remote_port}/{info.local_port}"
+        )
+        
+        return result
+
+class PendingRequest:
+    """Report request sent (or queued) to a client, completed by its SRSP"""
+    
+    def __init__(self, request_id: str, data: str):
+        """
+        Initialize the pending request
+        
+        Args:
+            request_id: CMD id the client echoes back in SRSP
+            data: Request data for the client
+        """
+        self.request_id = request_id
+        self.data = data
+        self.sent = False
+        self.future: Future = Future()
+    
+    def wait(self, timeout: float) -> str:
+        """
+        Wait for the client's response
+        
+        Args:
+            timeout: Maximum time to wait in seconds
+            
+        Returns:
+            Response data from SRSP
+            
+        Raises:
+            concurrent.futures.TimeoutError: If the client did not respond in time
+            ConnectionError: If the client disconnected
+        """
+        return self.future.result(timeout=timeout)
 
 class TCPConnection(RemoteConnection):
     """TCP connection class"""
     
-    def __init__(self, client_socket: socket.socket, address: Tuple[str, int], log_path: str):
+    __slots__ = (
+        "client_socket",
+        "address",
+        "client_id",
+        "key_id",
+        "time_diff_sec",
+        "server_key",
+        "crypto_key",
+        "compressors",
+        "client_host",
+        "client_name",
+        "app_type",
+        "app_version",
+        "db_type",
+        "expire_date",
+        "request_counter",
+        "destroying",
+        "send_lock",
+        "pending_requests",
+        "pending_lock",
+        "max_pending_requests",
+        "max_in_flight_requests",
+    )
+    
+    protocol = "TCP"
+    
+    def __init__(
+        self,
+        client_socket: socket.socket,
+        address: Tuple[str, int],
+        log_path: str,
+        max_pending_requests: int = 8,
+        max_in_flight_requests: int = 1,
+    ):
         super().__init__(log_path)
         self.client_socket = client_socket
         self.address = address
         self.client_id = ""
+        self.key_id = 0
         self.time_diff_sec = 0
         
         # Generate random server key (as in original code)
@@ -98,36 +215,29 @@ class TCPConnection(RemoteConnection):
             self.server_key = "D5F2"
             
         self.crypto_key = ""
+        
+        # DataCompressor instances keyed by (crypto key, client id), so the
+        # AES key is derived once per connection instead of per message
+        self.compressors: Dict[Tuple[str, Any], DataCompressor] = {}
+        
         self.client_host = ""
         self.client_name = ""
         self.app_type = ""
         self.app_version = ""
         self.db_type = ""
         self.expire_date = None
-        self.busy = False
         self.request_counter = 0
-        self.last_request = ""
-        self.last_response = ""
-        self.event = threading.Event()
         self.destroying = False
+        self.send_lock = threading.Lock()
+        
+        # Report requests keyed by CMD id, in submission order
+        self.pending_requests: "OrderedDict[str, PendingRequest]" = OrderedDict()
+        self.pending_lock = threading.Lock()
+        self.max_pending_requests = max_pending_requests
+        self.max_in_flight_requests = max_in_flight_requests
         
         # Indicate connection was established
         self.on_connect(client_socket, address)
-        
-    def connection_info_as_text(self) -> str:
-        """Get connection information as text"""
-        result = f"TCP Start:{self.connection_info.connect_time.strftime('%M%S.%f')} "
-        
-        if self.connection_info.disconnect_time:
-            result += f"End:{self.connection_info.disconnect_time.strftime('%M%S.%f')} "
-            
-        result += (
-            f"Time:{self.connected_time_sec} "
-            f"RH:{self.connection_info.remote_ip} "
-            f"R/LP:{self.connection_info.remote_port}/{self.connection_info.local_port}"
-        )
-        
-        return result
     
     def set_time_diff(self, s_date: str, s_time: str) -> None:
         """Set time difference between client and server"""
@@ -155,45 +265,48 @@ class TCPConnection(RemoteConnection):
         try:
             # Get client ID
             client_id = int(data.get("ID", "0"))
-            print(f"Initializing crypto key for client ID: {client_id}")
+            self.logger.debug("Initializing crypto key for client ID: %s", client_id)
             
             if client_id < 1 or client_id > 10:
                 self.last_error = f"Invalid client ID: {client_id}"
-                print(f"Invalid client ID: {client_id} (must be between 1-10)")
+                self.logger.warning("Invalid client ID: %s (must be between 1-10)", client_id)
                 return False, 0
                 
             # Get hostname
             self.client_host = data.get("HST", "")
-            print(f"Client hostname: {self.client_host}")
+            self.logger.debug("Client hostname: %s", self.client_host)
             
             if not self.client_host:
                 self.last_error = "Hostname is empty"
-                print("Error: Client hostname is empty")
+                self.logger.warning("Client hostname is empty")
                 return False, 0
             
+            self.key_id = client_id
+            
             # Special handling for ID=8
             if client_id == 8:
                 self.server_key = ID8_KEY
-                print(f"Using special key for ID=8: KEY={ID8_KEY}, LEN={ID8_LEN}")
+                self.logger.debug("Using special key for ID=8, LEN=%d", ID8_LEN)
                 return True, ID8_LEN
             
-            # Generate crypto key
+            # Generate crypto key and derive the AES key for it once
             self.crypto_key = generate_client_crypto_key(client_id, self.server_key, self.client_host)
-            print(f"Generated crypto key: {self.crypto_key}")
+            self.logger.debug("Generated crypto key: %s", self.crypto_key)
+            self.compressors.clear()
+            self.get_compressor(self.crypto_key, self.client_id)
             
             # Determine key length
             key_len = 2 if client_id == 9 else 1
-            print(f"Using key length: {key_len}")
             
             return True, key_len
             
         except Exception as e:
             self.last_error = f"Failed to initialize crypto key: {e}"
-            print(f"Exception in init_crypto_key: {e}")
+            self.logger.error("Exception in init_crypto_key: %s", e)
             return False, 0
     
-    def init_client_id(self, data: str, rest_url: str) -> bool:
-        """Initialize client ID using REST call"""
+    def init_client_id(self, data: str, rest_url: str, auth_client: Optional[AuthClient] = None) -> bool:
+        """Initialize client ID using REST call (through auth_client when given)"""
         try:
             # Split data into key-value pairs
             lines = data.split("\r\n")
@@ -225,7 +338,6 @@ class TCPConnection(RemoteConnection):
             if rest_url:
                 try:
                     # Prepare request to the authentication server
-                    api_url = f"{rest_url}/objectinfo"
                     params = {
                         "objectid": self.client_id,
                         "objectname": client_data.get("ON", ""),  # Office name
@@ -236,35 +348,35 @@ class TCPConnection(RemoteConnection):
                         "comment": f"App: {self.app_type} {self.app_version}"
                     }
                     
-                    # Send request
-                    response = requests.get(api_url, params=params, timeout=10)
+                    # Send request (cached and pooled by the auth client)
+                    if auth_client is None:
+                        auth_client = AuthClient(rest_url)
+                    result = auth_client.get_object_info(params)
                     
-                    if response.status_code == 200:
-                        # Parse response
-                        result = response.json()
-                        
-                        if result.get("result") == 0:
-                            # Set expiry date
-                            expire_str = result.get("expiredate", "")
-                            if expire_str:
-                                try:
-                                    # Format: YYYY-MM-DD
-                                    year, month, day = expire_str.split("-")
-                                    self.expire_date = datetime.datetime(
-                                        int(year), int(month), int(day)
-                                    )
-                                except Exception:
-                                    # Default expiry: 30 days from now
-                                    self.expire_date = datetime.datetime.now() + datetime.timedelta(days=30)
-                            else:
+                    if result.get("result") == 0:
+                        # Set expiry date
+                        expire_str = result.get("expiredate", "")
+                        if expire_str:
+                            try:
+                                # Format: YYYY-MM-DD
+                                year, month, day = expire_str.split("-")
+                                self.expire_date = datetime.datetime(
+                                    int(year), int(month), int(day)
+                                )
+                            except Exception:
                                 # Default expiry: 30 days from now
                                 self.expire_date = datetime.datetime.now() + datetime.timedelta(days=30)
-                                
-                            return True
                         else:
-                            self.last_error = f"REST API error: {result.get('message', 'Unknown error')}"
+                            # Default expiry: 30 days from now
+                            self.expire_date = datetime.datetime.now() + datetime.timedelta(days=30)
+                            
+                        return True
                     else:
-                        self.last_error = f"REST API HTTP error: {response.status_code}"
+                        self.last_error = f"REST API error: {result.get('message', 'Unknown error')}"
+                
+                except AuthServerError as e:
+                    self.last_error = f"REST API error: {e}"
+                    # Continue without REST validation (for backward compatibility)
                 
                 except Exception as e:
                     self.last_error = f"REST API request error: {e}"
@@ -280,35 +392,61 @@ class TCPConnection(RemoteConnection):
             self.last_error = f"Failed to initialize client ID: {e}"
             return False
     
+    @property
+    def decode_strategy_key(self) -> Optional[Tuple[int, str]]:
+        """
+        Key of this client in the shared decode strategy cache
+        
+        INFO is decrypted before the client ID is known, so the client is
+        identified by its INIT key ID and hostname.
+        """
+        if not self.key_id:
+            return None
+        return (self.key_id, self.client_host)
+    
+    def get_compressor(self, crypto_key: str, client_id: Any) -> DataCompressor:
+        """
+        Get the cached DataCompressor for a crypto key and client ID
+        
+        Args:
+            crypto_key: Crypto key
+            client_id: Client ID passed to the compressor
+            
+        Returns:
+            DataCompressor with its AES key already derived
+        """
+        compressor = self.compressors.get((crypto_key, client_id))
+        if compressor is None:
+            compressor = DataCompressor(
+                crypto_key, client_id, strategy_key=self.decode_strategy_key, logger=self.logger
+            )
+            self.compressors[(crypto_key, client_id)] = compressor
+        return compressor
+    
     def decrypt_data(self, source: str) -> Tuple[bool, str]:
         """
         Decrypt data using the client's crypto key
         """
         try:
-            self.logger.debug(f"[decrypt_data] Using client_id: {self.client_id}")
-            self.logger.debug(f"[decrypt_data] Creating DataCompressor with key '{self.crypto_key}' and client_id={self.client_id}")
-            data_compressor = DataCompressor(self.crypto_key, self.client_id)
+            self.logger.debug("[decrypt_data] Using client_id: %s", self.client_id)
+            data_compressor = self.get_compressor(self.crypto_key, self.client_id)
             result = data_compressor.decompress_data(source)
             return True, result
         except Exception as ex:
             # Special handling for client ID=2 and client ID=6
             if self.client_id in [2, 6]:
                 try:
-                    self.logger.debug(f"Special handling for client ID={self.client_id} after initial failure")
-                    if self.client_id == 2:
-                        # For client ID=2, use hardcoded key
-                        data_compressor = DataCompressor("D5F2aRD-", self.client_id)
-                    elif self.client_id == 6:
-                        # For client ID=6, use hardcoded key
-                        data_compressor = DataCompressor("D5F26NE-", self.client_id)
+                    self.logger.debug("Special handling for client ID=%s after initial failure", self.client_id)
+                    # Use the hardcoded key for this client ID
+                    data_compressor = self.get_compressor(HARDCODED_KEYS[self.client_id], self.client_id)
                     
                     result = data_compressor.decompress_data(source)
                     return True, result
                 except Exception as inner_ex:
-                    self.logger.error(f"Secondary decryption attempt failed for client ID={self.client_id}: {inner_ex}")
+                    self.logger.error("Secondary decryption attempt failed for client ID=%s: %s", self.client_id, inner_ex)
                     return False, f"Error decrypting data: {str(inner_ex)}"
             else:
-                self.logger.error(f"Error decrypting data: {str(ex)}")
+                self.logger.error("Error decrypting data: %s", ex)
                 return False, f"Error decrypting data: {str(ex)}"
     
     def encrypt_data(self, data: str) -> Tuple[bool, str]:
@@ -323,7 +461,7 @@ class TCPConnection(RemoteConnection):
         except ValueError:
             client_id = 0
             
-        compressor = DataCompressor(self.crypto_key, client_id)
+        compressor = self.get_compressor(self.crypto_key, client_id)
         result = compressor.compress_data(data)
         
         if result:
@@ -332,33 +470,135 @@ class TCPConnection(RemoteConnection):
         self.last_error = f"Failed to encrypt data: {compressor.last_error}"
         return False, ""
     
-    def send_request(self, data: str, reset_event: bool = True) -> bool:
-        """Send a request to the client"""
+    def write(self, data: bytes) -> None:
+        """
+        Write raw bytes to the client socket
+        
+        Serialized with send_lock because HTTP threads send requests while
+        the connection thread is writing command responses.
+        """
+        with self.send_lock:
+            self.client_socket.sendall(data)
+    
+    def shutdown(self) -> None:
+        """
+        Shut down the client socket from another thread
+        
+        Wakes up the connection thread blocked in recv(), which then closes
+        the socket itself.
+        """
         try:
-            if reset_event:
-                self.event.clear()
-                
-            self.busy = True
-            self.last_request = data
-            
-            # Send data to client
-            full_data = f"{data}{LINE_SEPARATOR}"
-            self.client_socket.sendall(full_data.encode('utf-8'))
+            self.client_socket.shutdown(socket.SHUT_RDWR)
+        except Exception:
+            pass
+    
+    def close(self) -> None:
+        """Close the client socket"""
+        try:
+            self.client_socket.close()
+        except Exception:
+            pass
+    
+    def submit_request(self, data: str) -> Optional[PendingRequest]:
+        """
+        Queue a report request for the client
+        
+        Up to max_in_flight_requests requests are sent to the client at
+        once; the rest wait in the pending table and are sent as responses
+        arrive.
+        
+        Args:
+            data: Request data for the client
             
-            return True
-        except Exception as e:
-            self.last_error = f"Failed to send request: {e}"
-            self.busy = False
-            return False
+        Returns:
+            Pending request to wait on, or None if the client's queue is full
+        """
+        with self.pending_lock:
+            if len(self.pending_requests) >= self.max_pending_requests:
+                self.last_error = f"Too many pending requests ({len(self.pending_requests)})"
+                return None
+            
+            self.request_counter += 1
+            pending = PendingRequest(str(self.request_counter), data)
+            self.pending_requests[pending.request_id] = pending
+        
+        self._send_queued()
+        return pending
+    
+    def cancel_request(self, pending: PendingRequest) -> None:
+        """
+        Remove a request from the pending table, e.g. after a timeout
+        
+        A late SRSP for it is then ignored and its slot goes to the next
+        queued request.
+        
+        Args:
+            pending: Request to remove
+        """
+        with self.pending_lock:
+            removed = self.pending_requests.pop(pending.request_id, None)
+        
+        if removed:
+            removed.future.cancel()
+            self._send_queued()
+    
+    def _send_queued(self) -> None:
+        """Send queued requests while fewer than max_in_flight_requests are outstanding"""
+        to_send = []
+        
+        with self.pending_lock:
+            in_flight = sum(1 for pending in self.pending_requests.values() if pending.sent)
+            for pending in self.pending_requests.values():
+                if in_flight >= self.max_in_flight_requests:
+                    break
+                if not pending.sent:
+                    pending.sent = True
+                    in_flight += 1
+                    to_send.append(pending)
+        
+        for pending in to_send:
+            try:
+                self.write(f"200 CMD={pending.request_id} DATA={pending.data}{LINE_SEPARATOR}".encode('utf-8'))
+            except Exception as e:
+                self.last_error = f"Failed to send request: {e}"
+                with self.pending_lock:
+                    removed = self.pending_requests.pop(pending.request_id, None)
+                # A disconnect or cancel may have completed the request already
+                if removed is not None and not pending.future.done():
+                    pending.future.set_exception(ConnectionError(self.last_error))
+    
+    def fail_pending_requests(self, reason: str) -> None:
+        """
+        Fail all pending requests, e.g. when the client disconnects
+        
+        Args:
+            reason: Error message for the waiting callers
+        """
+        with self.pending_lock:
+            pending_list = list(self.pending_requests.values())
+            self.pending_requests.clear()
+        
+        for pending in pending_list:
+            if not pending.future.done():
+                pending.future.set_exception(ConnectionError(reason))
+    
+    def on_disconnect(self):
+        """Handle client disconnection"""
+        super().on_disconnect()
+        self.fail_pending_requests("Client disconnected")
     
     def get_response(self, r_cntr: str, data: str) -> bool:
         """Process response from client"""
         try:
-            self.busy = False
-            self.last_response = data
+            # Complete the matching pending request; responses to requests
+            # that already timed out are dropped
+            with self.pending_lock:
+                pending = self.pending_requests.pop(r_cntr, None)
             
-            # Signal that response has been received
-            self.event.set()
+            if pending:
+                if not pending.future.done():
+                    pending.future.set_result(data)
+                self._send_queued()
             
             return True
         except Exception as e:
@@ -372,8 +612,8 @@ class TCPConnection(RemoteConnection):
                 # Can't log without client ID
                 return
                 
-            # Create Logger for this client
-            error_logger = Logger(self.log_path, f"ErrLog_{self.client_id}.txt")
+            # Shared logger for this client's error log
+            error_logger = get_logger(self.log_path, f"ErrLog_{self.client_id}.txt")
             
             # Log the error
             error_logger.log(msg)
@@ -384,67 +624,89 @@ class TCPConnection(RemoteConnection):
 class HTTPConnection(RemoteConnection):
     """HTTP connection class"""
     
+    __slots__ = ()
+    
+    protocol = "HTTP"
+    
     def __init__(self, log_path: str):
         super().__init__(log_path)
+
+# Handler of a command: function(handler, frame) returning the response
+CommandFunc = Callable[["TCPCommandHandler", Frame], str]
+
+class TCPCommandHandler:
+    """
+    TCP command handler class
     
-    def connection_info_as_text(self) -> str:
-        """Get connection information as text"""
-        result = f"HTTP Start:{self.connection_info.connect_time.strftime('%M%S.%f')} "
+    Commands are dispatched through command_table; register_command()
+    plugs in handlers for new commands or replaces built-in ones.
+    """
+    
+    # Command name -> handler function
+    command_table: Dict[str, CommandFunc] = {}
+    
+    @classmethod
+    def register_command(cls, name: str, func: CommandFunc) -> None:
+        """
+        Register the handler of a command
         
-        if self.connection_info.disconnect_time:
-            result += f"End:{self.connection_info.disconnect_time.strftime('%M%S.%f')} "
-            
-        result += (
-            f"Time:{self.connected_time_sec} "
-            f"RH:{self.connection_info.remote_ip} "
-            f"R/LP:{self.connection_info.remote_port}/{self.connection_info.local_port}"
-        )
+        A subclass gets its own copy of the table on its first
+        registration, so the base class table is not changed.
         
-        return result
-
-class TCPCommandHandler:
-    """TCP command handler class"""
+        Args:
+            name: Command name (case-insensitive)
+            func: Function(handler, frame) returning the response
+        """
+        if "command_table" not in cls.__dict__:
+            cls.command_table = dict(cls.command_table)
+        cls.command_table[name.upper()] = func
     
-    def __init__(self, connection: TCPConnection, auth_server_url: str):
+    def __init__(
+        self,
+        connection: TCPConnection,
+        auth_server_url: str,
+        auth_client: Optional[AuthClient] = None,
+        error_sink: Optional[ErrorLogSink] = None,
+        trace_logger: Optional[TraceLogger] = None,
+    ):
         self.connection = connection
         self.auth_server_url = auth_server_url
+        self.auth_client = auth_client
+        self.error_sink = error_sink
+        self.trace_logger = trace_logger
     
-    def handle_command(self, command: str, command_data: Dict[str, str]) -> str:
+    def handle_command(self, frame: Frame) -> str:
         """Handle a TCP command"""
         # Update last action time
-        self.connection.connection_info.last_action = datetime.datetime.now()
+        self.connection.connection_info.last_action = time.monotonic()
         
-        # Process different commands
-        cmd_parts = command.split()
-        if not cmd_parts:
+        cmd = frame.command
+        if not cmd:
             return f"{TCP_ERR_FAIL_DECODE_DATA} Command is empty"
-            
-        cmd = cmd_parts[0].upper()
-        
-        if cmd == "INIT":
-            return self.handle_init(command_data)
-        elif cmd == "INFO":
-            return self.handle_info(command_data)
-        elif cmd == "PING":
-            return self.handle_ping()
-        elif cmd == "GREQ":
-            return self.handle_greq()
-        elif cmd == "SRSP":
-            return self.handle_srsp(command_data)
-        elif cmd == "VERS":
-            return self.handle_vers()
-        elif cmd == "DWNL":
-            return self.handle_dwnl(command_data)
-        elif cmd == "ERRL":
-            return self.handle_errl(command.replace("ERRL ", "", 1))
-        else:
+        
+        func = self.command_table.get(cmd)
+        if func is None:
             return f"{TCP_ERR_FAIL_DECODE_DATA} Unknown command: {cmd}"
+        
+        trace_logger = self.trace_logger
+        if trace_logger is not None:
+            context = f"client={self.connection.client_id or self.connection.connection_info.remote_ip}"
+            trace_logger.enter(cmd, context)
+        
+        start = time.perf_counter()
+        try:
+            return func(self, frame)
+        finally:
+            elapsed = time.perf_counter() - start
+            tcp_command_duration.observe(elapsed, cmd if cmd in TCP_COMMANDS else "OTHER")
+            if trace_logger is not None:
+                trace_logger.exit(cmd, elapsed, context)
     
     def handle_init(self, data: Dict[str, str]) -> str:
         """Handle INIT command"""
         try:
             # Log incoming init request
-            print(f"Received INIT request with data: {data}")
+            self.connection.logger.debug("Received INIT request with data: %s", data)
             
             # Set time difference
             if "DT" in data and "TM" in data:
@@ -453,45 +715,39 @@ class TCPCommandHandler:
             # Initialize crypto key
             success, key_len = self.connection.init_crypto_key(data)
             if not success:
-                print(f"Failed to initialize crypto key: {self.connection.last_error}")
+                self.connection.logger.warning("Failed to initialize crypto key: %s", self.connection.last_error)
                 return f"{TCP_ERR_INVALID_CRYPTO_KEY} {self.connection.last_error}"
             
             # Format response
-            response = f"200-KEY={self.connection.server_key}{LINE_SEPARATOR}200 LEN={key_len}"
-            print(f"INIT response: {response}")
-            
-            return response
+            return f"200-KEY={self.connection.server_key}{LINE_SEPARATOR}200 LEN={key_len}"
         except Exception as e:
-            print(f"Exception in handle_init: {e}")
+            self.connection.logger.error("Exception in handle_init: %s", e)
             return f"{TCP_ERR_INVALID_CRYPTO_KEY} Error: {e}"
     
     def handle_info(self, data: Dict[str, str]) -> str:
         """Handle INFO command"""
         try:
-            # Log incoming info request
-            print(f"Received INFO request with data param length: {len(data.get('DATA', ''))}")
-            
             # Check if DATA parameter exists
             if "DATA" not in data:
-                print("ERROR: Missing DATA parameter in INFO request")
+                self.connection.logger.warning("Missing DATA parameter in INFO request")
                 return f"{TCP_ERR_INVALID_DATA_PACKET} Missing DATA parameter"
             
             # Decrypt data
-            print(f"Attempting to decrypt data with key: {self.connection.crypto_key}, client_id: {self.connection.client_id}")
+            self.connection.logger.debug("Received INFO request with DATA length: %d", len(data["DATA"]))
             success, decrypted = self.connection.decrypt_data(data["DATA"])
             if not success:
-                print(f"ERROR: Failed to decrypt INFO data: {decrypted}")
+                self.connection.logger.warning("Failed to decrypt INFO data: %s", decrypted)
                 return f"{TCP_ERR_FAIL_DECODE_DATA} Failed to decrypt data"
             
-            print(f"Successfully decrypted INFO data: {decrypted}")
+            self.connection.logger.debug("Decrypted INFO data: %s", decrypted)
             
             # Initialize client ID
-            success = self.connection.init_client_id(decrypted, self.auth_server_url)
+            success = self.connection.init_client_id(decrypted, self.auth_server_url, self.auth_client)
             if not success:
-                print(f"ERROR: Failed to initialize client ID: {self.connection.last_error}")
+                self.connection.logger.warning("Failed to initialize client ID: %s", self.connection.last_error)
                 return f"{TCP_ERR_FAIL_INIT_CLIENT_ID} {self.connection.last_error}"
             
-            print(f"Successfully initialized client ID: {self.connection.client_id}")
+            self.connection.logger.debug("Initialized client ID: %s", self.connection.client_id)
             
             # Prepare response data
             now = datetime.datetime.now()
@@ -507,21 +763,18 @@ class TCPCommandHandler:
             response_data += f"CD={now.strftime('%Y-%m-%d')}\r\n"  # Creation date
             response_data += f"CT={now.strftime('%H:%M:%S')}\r\n"  # Creation time
             
-            print(f"Preparing to encrypt response: {response_data}")
+            self.connection.logger.debug("Preparing to encrypt response: %s", response_data)
             
             # Encrypt response
             success, encrypted = self.connection.encrypt_data(response_data)
             if not success:
-                print(f"ERROR: Failed to encrypt INFO response: {self.connection.last_error}")
+                self.connection.logger.warning("Failed to encrypt INFO response: %s", self.connection.last_error)
                 return f"{TCP_ERR_FAIL_ENCODE_DATA} Failed to encrypt response"
             
             # Format full response
-            response = f"200 DATA={encrypted}"
-            print(f"INFO response length: {len(response)}")
-            
-            return response
+            return f"200 DATA={encrypted}"
         except Exception as e:
-            print(f"ERROR: Exception in handle_info: {e}")
+            self.connection.logger.error("Exception in handle_info: %s", e)
             print(traceback.format_exc(), file=sys.stderr)
             return f"{TCP_ERR_FAIL_DECODE_DATA} Error: {e}"
     
@@ -576,10 +829,22 @@ class TCPCommandHandler:
     def handle_errl(self, error_msg: str) -> str:
         """Handle ERRL command"""
         try:
-            # Log error message
-            if error_msg:
+            # Log error message, rate limited and deduplicated by the sink
+            if self.error_sink:
+                self.error_sink.post(self.connection.client_id, error_msg)
+            elif error_msg:
                 self.connection.post_error_to_file(error_msg)
             
             return RESPONSE_OK
         except Exception as e:
-            return f"{TCP_ERR_FAIL_DECODE_DATA} Error: {e}" 
\ No newline at end of file
+            return f"{TCP_ERR_FAIL_DECODE_DATA} Error: {e}" 
+
+# Built-in commands
+TCPCommandHandler.register_command("INIT", lambda handler, frame: handler.handle_init(frame.params))
+TCPCommandHandler.register_command("INFO", lambda handler, frame: handler.handle_info(frame.params))
+TCPCommandHandler.register_command("PING", lambda handler, frame: handler.handle_ping())
+TCPCommandHandler.register_command("GREQ", lambda handler, frame: handler.handle_greq())
+TCPCommandHandler.register_command("SRSP", lambda handler, frame: handler.handle_srsp(frame.params))
+TCPCommandHandler.register_command("VERS", lambda handler, frame: handler.handle_vers())
+TCPCommandHandler.register_command("DWNL", lambda handler, frame: handler.handle_dwnl(frame.params))
+TCPCommandHandler.register_command("ERRL", lambda handler, frame: handler.handle_errl(frame.payload))
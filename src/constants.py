@@ -8,6 +8,12 @@ TRACE_LOG_FILENAME = 'TraceLog_Server.txt'
 # Connection timeouts
 DROP_DEVICE_WITHOUT_SERIAL_TIME_SEC = 60  # Time in seconds after which to drop connections without client ID
 DROP_DEVICE_WITHOUT_ACTIVITY_SEC = 120    # Time in seconds after which to drop inactive connections
+CLIENT_LIST_REFRESH_SEC = 1               # Time in seconds a client list snapshot is reused
+
+# Report responses
+REPORT_STREAM_THRESHOLD = 256 * 1024  # Responses of at least this many characters are streamed
+REPORT_STREAM_CHUNK_SIZE = 64 * 1024  # Characters per streamed chunk
+DISCONNECT_POLL_SEC = 0.5             # Time in seconds between checks whether a /report caller disconnected
 
 # HTTP Error codes
 HTTP_ERR_MISSING_CLIENT_ID = 100
@@ -60,6 +66,12 @@ HARDCODED_KEYS = {
 ID8_KEY = 'D028'
 ID8_LEN = 4
 
+# Maximum number of candidate zlib headers probed when searching decrypted data
+ZLIB_SCAN_MAX_OFFSETS = 64
+
+# Maximum length of a single command line from a client (large SRSP reports)
+MAX_LINE_SIZE = 16 * 1024 * 1024
+
 # Line separator for response messages
 LINE_SEPARATOR = '\r\n'
 
@@ -1,34 +1,210 @@
 #!/usr/bin/env python3
 import base64
+import codecs
+import functools
 import sys
 import traceback
 import hashlib
+import itertools
+import re
+import threading
 import zlib
-import logging
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad, unpad
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[logging.StreamHandler(sys.stderr)]
-)
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional
+
+from constants import ZLIB_SCAN_MAX_OFFSETS
+from logger import Logger
+from metrics import decode_failures, decode_plain_fallbacks
+
+@functools.lru_cache(maxsize=256)
+def derive_aes_key(crypto_key: str) -> bytes:
+    """
+    Derive the AES key (MD5 digest) for a crypto key
+    
+    Cached, so the fixed keys (HARDCODED_KEYS, ID8_KEY) and keys of
+    reconnecting clients are hashed only once.
+    
+    Args:
+        crypto_key: The crypto key string
+        
+    Returns:
+        16-byte AES key
+    """
+    return hashlib.md5(crypto_key.encode('utf-8')).digest()
+
+# Decompression strategies tried on decrypted data, in default order
+DECOMPRESS_STRATEGIES = ("zlib", "deflate", "gzip", "scan")
+
+# zlib window bits of the strategies that can decompress incrementally
+STREAM_STRATEGY_WBITS = {
+    "zlib": zlib.MAX_WBITS,
+    "deflate": -15,
+    "gzip": 16 + zlib.MAX_WBITS,
+}
+
+# Base64 payloads at least this long are decoded incrementally
+STREAM_DECODE_THRESHOLD = 256 * 1024
+
+# Base64 characters decoded per step of the incremental pipeline (multiple of 4)
+STREAM_DECODE_CHUNK = 64 * 1024
+
+# Bytes fed to a decompressobj to check a candidate zlib header
+ZLIB_PROBE_BYTES = 64
+
+# Bytes that can start a zlib header (CM=8, CINFO<=7)
+ZLIB_CMF_PATTERN = re.compile(b"[\x08\x18\x28\x38\x48\x58\x68\x78]")
+
+def is_zlib_header(cmf: int, flg: int) -> bool:
+    """
+    Check whether two bytes form a zlib header zlib.decompress() accepts
+    
+    Args:
+        cmf: Compression method and flags byte
+        flg: Flags byte
+        
+    Returns:
+        True for deflate with a window of at most 32K, no preset
+        dictionary and a valid header checksum
+    """
+    return (
+        (cmf & 0x0F) == 8
+        and (cmf >> 4) <= 7
+        and (flg & 0x20) == 0
+        and ((cmf << 8) | flg) % 31 == 0
+    )
+
+class DecodeStrategyCache:
+    """
+    Shared table of the decompression strategy that worked per client
+    
+    A client always uses the same framing, so a reconnecting client
+    starts with the strategy learned on its previous connections.
+    """
+    
+    def __init__(self, max_entries: int = 10000):
+        """
+        Initialize the cache
+        
+        Args:
+            max_entries: Maximum number of clients remembered (least recently used are dropped)
+        """
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Any, str]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: Any) -> Optional[str]:
+        """
+        Get the learned strategy for a client
+        
+        Args:
+            key: Client key
+            
+        Returns:
+            Strategy name, or None if nothing was learned yet
+        """
+        with self.lock:
+            strategy = self.entries.get(key)
+            if strategy is not None:
+                self.entries.move_to_end(key)
+            return strategy
+    
+    def record(self, key: Any, strategy: str, hit: bool) -> None:
+        """
+        Record the strategy that decoded a payload
+        
+        Args:
+            key: Client key
+            strategy: Strategy that succeeded
+            hit: Whether the learned strategy succeeded on the first try
+        """
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            
+            self.entries[key] = strategy
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get hit/miss counters
+        
+        Returns:
+            Dictionary with hits, misses and number of clients remembered
+        """
+        with self.lock:
+            return {
+                "Hits": self.hits,
+                "Misses": self.misses,
+                "Clients": len(self.entries),
+            }
+
+# Strategies learned per client, shared by all connections
+decode_strategy_cache = DecodeStrategyCache()
 
 # DataCompressor class for handling encryption/decryption and compression
 class DataCompressor:
-    def __init__(self, crypto_key: str = '', client_id: int = 0):
+    def __init__(
+        self,
+        crypto_key: str = '',
+        client_id: int = 0,
+        max_probe_offsets: int = ZLIB_SCAN_MAX_OFFSETS,
+        strategy_key: Any = None,
+        logger: Optional[Logger] = None,
+    ):
         """
         Initialize the DataCompressor
         
         Args:
             crypto_key: Optional crypto key
             client_id: Optional client ID
+            max_probe_offsets: Maximum number of candidate zlib headers probed by the scan strategy
+            strategy_key: Optional client key in decode_strategy_cache
+            logger: Optional logger for level-gated diagnostics
         """
         self.crypto_key = crypto_key
         self.client_id = client_id
+        self.max_probe_offsets = max_probe_offsets
+        self.strategy_key = strategy_key
+        self.logger = logger
         self.last_error = ''
         
+        # Decompression strategy that succeeded last, tried first next time
+        self.strategy = None
+        if strategy_key is not None:
+            self.strategy = decode_strategy_cache.get(strategy_key)
+        self.scan_offset = None
+        
+        # AES key derived once per compressor
+        if client_id == 8:
+            from constants import ID8_KEY, ID8_LEN
+            self.aes_key = derive_aes_key(ID8_KEY[:ID8_LEN])
+        else:
+            self.aes_key = derive_aes_key(crypto_key)
+        
+    def _debug(self, message: str, *args: Any) -> None:
+        """Log a debug message, formatted only when DEBUG is enabled"""
+        if self.logger is not None:
+            self.logger.debug(message, *args)
+    
+    def _warning(self, message: str, *args: Any) -> None:
+        """Log a warning message"""
+        if self.logger is not None:
+            self.logger.warning(message, *args)
+    
+    def _error(self, message: str, *args: Any) -> None:
+        """Log an error message"""
+        if self.logger is not None:
+            self.logger.error(message, *args)
+    
     def compress_data(self, source: str) -> str:
         """
         Compress, encrypt, and Base64 encode data
@@ -48,7 +224,7 @@ class DataCompressor:
                 
             # Compress the data
             compressed_data = zlib.compress(source_bytes)
-            print(f"Compressed data length: {len(compressed_data)}", file=sys.stderr)
+            self._debug("Compressed data length: %d", len(compressed_data))
             
             # Encrypt the data if we have a crypto key
             if self.crypto_key:
@@ -57,10 +233,9 @@ class DataCompressor:
                     if self.client_id == 8:
                         from constants import ID8_KEY, ID8_LEN
                         key = ID8_KEY[:ID8_LEN]
-                        print(f"Using special ID8 key: {key}", file=sys.stderr)
                     else:
                         # Use MD5 hash of the crypto key as key
-                        key = hashlib.md5(self.crypto_key.encode('utf-8')).digest()
+                        key = self.aes_key
 
                     # Create AES cipher
                     cipher = AES.new(key, AES.MODE_CBC, iv=bytes(16))
@@ -72,8 +247,7 @@ class DataCompressor:
                     encrypted_data = cipher.encrypt(padded_data)
                 except Exception as e:
                     self.last_error = f'[compress_data] Encrypt error: {str(e)}'
-                    print(f"Encrypt error: {e}", file=sys.stderr)
-                    print(traceback.format_exc(), file=sys.stderr)
+                    self._error("Encrypt error: %s", e)
                     return ''
             else:
                 # No encryption
@@ -85,10 +259,159 @@ class DataCompressor:
             
         except Exception as e:
             self.last_error = f'[compress_data] {str(e)}'
-            print(f"Error in compress_data: {e}", file=sys.stderr)
-            print(traceback.format_exc(), file=sys.stderr)
+            self._error("Error in compress_data: %s", e)
             return ''
     
+    def _strategy_order(self):
+        """Get decompression strategies with the last successful one first"""
+        if self.strategy is None:
+            return DECOMPRESS_STRATEGIES
+        return (self.strategy,) + tuple(s for s in DECOMPRESS_STRATEGIES if s != self.strategy)
+    
+    def _decompress_with(self, strategy: str, data: bytes) -> bytes:
+        """
+        Decompress data with one strategy
+        
+        Args:
+            strategy: Name from DECOMPRESS_STRATEGIES
+            data: Decrypted data
+            
+        Returns:
+            Decompressed bytes
+            
+        Raises:
+            zlib.error: If the data is not valid for this strategy
+        """
+        if strategy == "zlib":
+            return zlib.decompress(data)
+        if strategy == "deflate":
+            return zlib.decompress(data, -15)  # Negative wbits for raw deflate
+        if strategy == "gzip":
+            return zlib.decompress(data, 16 + zlib.MAX_WBITS)  # Add 16 for gzip header
+        return self._scan_zlib_stream(data)
+    
+    def iter_decompress(self, source: str, strategy: str = "zlib") -> Iterator[str]:
+        """
+        Decode Base64, decrypt with AES-CBC and decompress incrementally
+        
+        Each step works on STREAM_DECODE_CHUNK characters of the source, so
+        a large payload never exists as full decoded, decrypted and
+        decompressed copies at the same time. Only the streaming strategies
+        (zlib, raw deflate, gzip) are supported; the header scan needs the
+        whole buffer.
+        
+        Args:
+            source: Base64 encoded payload (padding already added)
+            strategy: Name from STREAM_STRATEGY_WBITS
+            
+        Yields:
+            Decompressed text chunks
+            
+        Raises:
+            zlib.error: If the data is not a complete stream for this strategy
+            ValueError: If the Base64 data is invalid
+        """
+        cipher = AES.new(self.aes_key, AES.MODE_CBC, bytes(16))
+        decompressor = zlib.decompressobj(STREAM_STRATEGY_WBITS[strategy])
+        text_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        carry = b""
+        
+        for start in range(0, len(source), STREAM_DECODE_CHUNK):
+            binary = carry + base64.b64decode(source[start:start + STREAM_DECODE_CHUNK])
+            
+            # Decrypt whole blocks; the cipher object keeps the CBC chain
+            usable = len(binary) - len(binary) % AES.block_size
+            carry = binary[usable:]
+            if usable:
+                chunk = decompressor.decompress(cipher.decrypt(binary[:usable]))
+                if chunk:
+                    yield text_decoder.decode(chunk)
+        
+        # Pad an incomplete last block as decompress_data does
+        if carry:
+            padding_size = AES.block_size - len(carry)
+            chunk = decompressor.decompress(cipher.decrypt(carry + bytes([padding_size]) * padding_size))
+            if chunk:
+                yield text_decoder.decode(chunk)
+        
+        # Trailing PKCS#7 padding ends up in unused_data
+        if not decompressor.eof:
+            raise zlib.error(f"Incomplete {strategy} stream")
+        
+        yield text_decoder.decode(decompressor.flush(), final=True)
+    
+    def _decompress_streaming(self, source: str) -> Optional[str]:
+        """
+        Decompress a large payload with the incremental pipeline
+        
+        Args:
+            source: Base64 encoded payload (padding already added)
+            
+        Returns:
+            Decompressed text, or None if the payload needs the in-memory cascade
+        """
+        strategy = self.strategy or "zlib"
+        if strategy not in STREAM_STRATEGY_WBITS:
+            return None
+        
+        try:
+            decoded_str = "".join(self.iter_decompress(source, strategy))
+        except (zlib.error, ValueError) as e:
+            self._debug("Streaming %s decompression failed: %s", strategy, e)
+            return None
+        
+        if self.strategy_key is not None:
+            decode_strategy_cache.record(self.strategy_key, strategy, hit=(strategy == self.strategy))
+        self.strategy = strategy
+        return decoded_str
+    
+    def _scan_zlib_stream(self, data: bytes) -> bytes:
+        """
+        Find and decompress a zlib stream embedded in the data
+        
+        Candidate offsets are filtered by the zlib header check and probed
+        with a decompressobj on a few bytes before a full decompression is
+        attempted. Slices are memoryviews, so no candidate copies the buffer.
+        At most max_probe_offsets candidates are probed.
+        
+        Args:
+            data: Decrypted data
+            
+        Returns:
+            Decompressed bytes
+            
+        Raises:
+            zlib.error: If no zlib stream was found
+        """
+        view = memoryview(data)
+        end = len(data) - 10
+        
+        # Offset that worked for the previous payload first, then every
+        # byte that can start a zlib header, found in a single C-level pass
+        offsets = (match.start() for match in ZLIB_CMF_PATTERN.finditer(data, 0, max(end, 0)))
+        if self.scan_offset is not None and self.scan_offset < end:
+            offsets = itertools.chain((self.scan_offset,), offsets)
+        
+        probes = 0
+        for offset in offsets:
+            if probes >= self.max_probe_offsets:
+                break
+            if not is_zlib_header(data[offset], data[offset + 1]):
+                continue
+            
+            probes += 1
+            try:
+                zlib.decompressobj().decompress(view[offset:offset + ZLIB_PROBE_BYTES])
+                result = zlib.decompress(view[offset:])
+            except zlib.error:
+                continue
+            
+            self._debug("Found valid zlib stream at offset %d", offset)
+            self.scan_offset = offset
+            return result
+        
+        raise zlib.error(f"No zlib stream found after probing {probes} offsets")
+    
     def decompress_data(self, source: str) -> str:
         """
         Decompress data.
@@ -97,200 +420,117 @@ class DataCompressor:
         self.last_error = ""
 
         try:
-            print(f"Starting decompress_data for client_id={self.client_id}, key={self.crypto_key}", file=sys.stderr)
-            print(f"Data source length: {len(source)}", file=sys.stderr)
+            self._debug("Starting decompress_data for client_id=%s, source length=%d", self.client_id, len(source))
             
             # Add missing padding to Base64 if needed
             # Calculate number of padding chars needed (0, 1, 2, or 3)
             padding_needed = (4 - len(source) % 4) % 4
             if padding_needed:
                 source += "=" * padding_needed
-                print(f"Added {padding_needed} Base64 padding characters", file=sys.stderr)
-                logging.debug(f"Added {padding_needed} Base64 padding characters")
+                self._debug("Added %d Base64 padding characters", padding_needed)
+
+            # Large payloads go through the incremental pipeline first
+            if len(source) >= STREAM_DECODE_THRESHOLD and self.client_id not in [1, 4]:
+                decoded_str = self._decompress_streaming(source)
+                if decoded_str is not None:
+                    return decoded_str
 
             # Decode Base64
             try:
                 binary_data = base64.b64decode(source)
-                print(f"Decoded data length: {len(binary_data)}", file=sys.stderr)
-                logging.debug(f"Decoded data length: {len(binary_data)}")
+                self._debug("Decoded data length: %d", len(binary_data))
             except Exception as e:
-                print(f"Base64 decode error: {str(e)}", file=sys.stderr)
-                logging.error(f"Base64 decode error: {str(e)}")
+                decode_failures.inc("base64")
+                self._error("Base64 decode error: %s", e)
                 self.last_error = f"Base64 decode error: {str(e)}"
                 return ""
 
             # For client IDs 1 and 4, we handle specially
             if self.client_id in [1, 4]:
                 # For these client IDs, we don't need decryption, just decompression
-                print(f"Special handling for client ID={self.client_id} - no decryption needed", file=sys.stderr)
-                logging.debug(f"Special handling for client ID={self.client_id} - no decryption needed")
+                self._debug("Special handling for client ID=%s - no decryption needed", self.client_id)
                 try:
                     # Try standard zlib decompression
                     result = zlib.decompress(binary_data)
                     decoded_str = result.decode('utf-8', errors='replace')
-                    print(f"Successfully decompressed data for client ID={self.client_id}", file=sys.stderr)
-                    logging.debug(f"Successfully decompressed data for client ID={self.client_id}")
+                    self._debug("Successfully decompressed data for client ID=%s", self.client_id)
                     return decoded_str
                 except Exception as e:
-                    print(f"Special handling decompression failed for client ID={self.client_id}: {str(e)}", file=sys.stderr)
-                    logging.error(f"Special handling decompression failed for client ID={self.client_id}: {str(e)}")
+                    decode_failures.inc("zlib")
+                    self._error("Special handling decompression failed for client ID=%s: %s", self.client_id, e)
                     self.last_error = f"Decompression error: {str(e)}"
                     return ""
 
             # For clients 2 and 6, if data length is 152 bytes (not a multiple of 16)
             # we need special handling
             if self.client_id in [2, 6] and len(binary_data) == 152:
-                print(f"Special handling for client ID={self.client_id} with data length 152 bytes", file=sys.stderr)
-                logging.debug(f"Special handling for client ID={self.client_id} with data length 152 bytes")
                 # Add PKCS#7 padding to make it a multiple of 16
                 padding_size = 16 - (len(binary_data) % 16)
                 binary_data += bytes([padding_size]) * padding_size
-                print(f"Added {padding_size} bytes of PKCS#7 padding", file=sys.stderr)
-                logging.debug(f"Added {padding_size} bytes of PKCS#7 padding")
+                self._debug("Added %d bytes of PKCS#7 padding for client ID=%s with data length 152 bytes", padding_size, self.client_id)
             # For any client, if the data is not a multiple of 16, add PKCS#7 padding
             elif len(binary_data) % 16 != 0:
                 padding_size = 16 - (len(binary_data) % 16)
-                print(f"General padding for data with length {len(binary_data)} which is not a multiple of 16", file=sys.stderr)
-                print(f"Adding {padding_size} bytes of PKCS#7 padding", file=sys.stderr)
-                logging.debug(f"General padding for data with length {len(binary_data)} which is not a multiple of 16")
+                self._debug("Added %d bytes of PKCS#7 padding to data of length %d", padding_size, len(binary_data))
                 binary_data += bytes([padding_size]) * padding_size
-                print(f"New data length after padding: {len(binary_data)}", file=sys.stderr)
-                logging.debug(f"Added {padding_size} bytes of PKCS#7 padding")
 
-            # Generate key for AES decryption
-            if self.client_id == 8:
-                from constants import ID8_KEY, ID8_LEN
-                print(f"Using special key for ID=8: {ID8_KEY[:ID8_LEN]}", file=sys.stderr)
-                key = hashlib.md5(ID8_KEY[:ID8_LEN].encode()).digest()
-            else:
-                print(f"Using crypto key: {self.crypto_key}", file=sys.stderr)
-                key = hashlib.md5(self.crypto_key.encode()).digest()
-                
-            print(f"MD5 key: {key.hex()}", file=sys.stderr)
-            iv = bytes([0] * 16)  # Zero IV
-            print(f"Using zero IV", file=sys.stderr)
+            # Key for AES decryption (derived in __init__), zero IV
+            key = self.aes_key
+            iv = bytes([0] * 16)
 
             # Decrypt using AES
             try:
-                print(f"Creating AES cipher with key length: {len(key)}", file=sys.stderr)
                 cipher = AES.new(key, AES.MODE_CBC, iv)
-                print(f"Decrypting data of length: {len(binary_data)}", file=sys.stderr)
                 decrypted_data = cipher.decrypt(binary_data)
-                print(f"Decrypted data length: {len(decrypted_data)}", file=sys.stderr)
-                print(f"First 20 bytes of decrypted data: {decrypted_data[:20].hex()}", file=sys.stderr)
+                self._debug("Decrypted data length: %d", len(decrypted_data))
                 
                 # Remove PKCS#7 padding
                 try:
                     padding_len = decrypted_data[-1]
-                    print(f"Potential padding length: {padding_len}", file=sys.stderr)
                     if padding_len > 0 and padding_len <= 16:
                         # Check if the padding is correct
                         if all(byte == padding_len for byte in decrypted_data[-padding_len:]):
-                            print(f"Valid PKCS#7 padding detected, removing {padding_len} bytes", file=sys.stderr)
                             decrypted_data = decrypted_data[:-padding_len]
-                            print(f"Data length after padding removal: {len(decrypted_data)}", file=sys.stderr)
+                            self._debug("Removed %d bytes of valid PKCS#7 padding", padding_len)
                         else:
-                            print(f"Invalid padding pattern, using raw data", file=sys.stderr)
+                            self._debug("Invalid padding pattern, using raw data")
                     else:
-                        print(f"Padding length {padding_len} is invalid, using raw data", file=sys.stderr)
-                        logging.warning("Padding length is invalid, using raw data")
+                        self._warning("Padding length %d is invalid, using raw data", padding_len)
                 except Exception as e:
-                    print(f"Padding error: {str(e)}, using raw data", file=sys.stderr)
-                    logging.warning(f"Padding error: {str(e)}, using raw data")
+                    self._warning("Padding error: %s, using raw data", e)
             except Exception as e:
-                print(f"Decryption error: {str(e)}", file=sys.stderr)
-                logging.error(f"Decryption error: {str(e)}")
+                decode_failures.inc("decrypt")
+                self._error("Decryption error: %s", e)
                 self.last_error = f"Decryption error: {str(e)}"
                 return ""
             
             # Try decompression with different methods
-            print(f"Attempting to decompress data, length={len(decrypted_data)}", file=sys.stderr)
-            print(f"First few bytes of data: {' '.join([f'{b:02x}' for b in decrypted_data[:16]])}", file=sys.stderr)
-            logging.debug(f"Attempting to decompress data for client ID={self.client_id}, length={len(decrypted_data)}")
-            logging.debug(f"First few bytes of data: {' '.join([f'{b:02x}' for b in decrypted_data[:16]])}")
+            self._debug("Attempting to decompress data, length=%d", len(decrypted_data))
             
-            # Attempt decompression with multiple approaches
-            # Log data at start for debugging
-            decoded_str = ""
-
-            # Try standard zlib decompression
-            try:
-                print(f"Trying standard zlib decompression", file=sys.stderr)
-                logging.debug("Trying standard zlib decompression")
-                result = zlib.decompress(decrypted_data)
-                decoded_str = result.decode('utf-8', errors='replace')
-                print(f"Successful standard zlib decompression, result: {decoded_str[:100]}", file=sys.stderr)
-                logging.debug("Successful standard zlib decompression")
-                return decoded_str
-            except Exception as e:
-                print(f"Standard zlib decompression failed: {str(e)}", file=sys.stderr)
-                logging.debug(f"Standard zlib decompression failed: {str(e)}")
-            
-            # Try raw deflate decompression
-            try:
-                print(f"Trying raw deflate decompression", file=sys.stderr)
-                logging.debug("Trying raw deflate decompression")
-                result = zlib.decompress(decrypted_data, -15)  # Negative wbits for raw deflate
-                decoded_str = result.decode('utf-8', errors='replace')
-                print(f"Successful raw deflate decompression, result: {decoded_str[:100]}", file=sys.stderr)
-                logging.debug("Successful raw deflate decompression")
-                return decoded_str
-            except Exception as e:
-                print(f"Raw deflate decompression failed: {str(e)}", file=sys.stderr)
-                logging.debug(f"Raw deflate decompression failed: {str(e)}")
-            
-            # Try gzip decompression
-            try:
-                print(f"Trying gzip decompression", file=sys.stderr)
-                logging.debug("Trying gzip decompression")
-                result = zlib.decompress(decrypted_data, 16 + zlib.MAX_WBITS)  # Add 16 for gzip header
-                decoded_str = result.decode('utf-8', errors='replace')
-                print(f"Successful gzip decompression, result: {decoded_str[:100]}", file=sys.stderr)
-                logging.debug("Successful gzip decompression")
-                return decoded_str
-            except Exception as e:
-                print(f"Gzip decompression failed: {str(e)}", file=sys.stderr)
-                logging.debug(f"Gzip decompression failed: {str(e)}")
-            
-            # Look for zlib header in the data
-            print(f"Searching for valid zlib header in the data...", file=sys.stderr)
-            logging.debug("Searching for valid zlib header in the data...")
-            zlib_header_found = False
-            for i in range(len(decrypted_data) - 10):
-                try:
-                    if (decrypted_data[i] & 0xF0) == 0x70 and (decrypted_data[i+1] & 0x80) == 0:
-                        # Potential zlib header found
-                        print(f"Potential zlib header at offset {i}: {decrypted_data[i:i+10].hex()}", file=sys.stderr)
-                        result = zlib.decompress(decrypted_data[i:])
-                        decoded_str = result.decode('utf-8', errors='replace')
-                        print(f"Found valid zlib header at offset {i}, result: {decoded_str[:100]}", file=sys.stderr)
-                        logging.debug(f"Found valid zlib header at offset {i}")
-                        zlib_header_found = True
-                        break
-                except Exception:
-                    continue
-            
-            if not zlib_header_found:
-                print(f"No valid zlib header found, trying additional approaches", file=sys.stderr)
-                logging.debug("No valid zlib header found, trying additional approaches")
-                # Other approaches haven't worked, try returning the decrypted data as UTF-8
+            # Try the decompression strategies, the one that worked last time first
+            for strategy in self._strategy_order():
                 try:
-                    decoded_str = decrypted_data.decode('utf-8', errors='replace')
-                    print(f"Decoded as plain UTF-8 text: {decoded_str[:100]}", file=sys.stderr)
+                    result = self._decompress_with(strategy, decrypted_data)
                 except Exception as e:
-                    print(f"Failed to decode as UTF-8: {str(e)}", file=sys.stderr)
-                    logging.error(f"Failed to decode as UTF-8: {str(e)}")
-                    pass
+                    self._debug("%s decompression failed: %s", strategy, e)
+                    continue
+                
+                if self.strategy_key is not None:
+                    decode_strategy_cache.record(self.strategy_key, strategy, hit=(strategy == self.strategy))
+                self.strategy = strategy
+                self._debug("Successful %s decompression", strategy)
+                return result.decode('utf-8', errors='replace')
             
-            # If all attempts fail or if the result doesn't contain TT=Test, return raw data
-            print(f"Returning raw data as text (length: {len(decoded_str)}): {decoded_str[:100]}", file=sys.stderr)
-            logging.debug(f"Returning raw data as text: {decoded_str[:50]}")
-            return decoded_str
+            # Other approaches haven't worked, return the decrypted data as UTF-8
+            decode_plain_fallbacks.inc()
+            self._debug("No valid compressed stream found, decoding as plain UTF-8 text")
+            return decrypted_data.decode('utf-8', errors='replace')
         except Exception as e:
+            decode_failures.inc("error")
             self.last_error = str(e)
+            self._error("Error decompressing data: %s", e)
             print(f"Error decompressing data: {str(e)}", file=sys.stderr)
             print(traceback.format_exc(), file=sys.stderr)
-            logging.error(f"Error decompressing data: {str(e)}")
             return ""
 
 def check_registration_key(serial: str, key: str) -> bool:
@@ -376,9 +616,7 @@ def generate_client_crypto_key(client_id: int, server_key: str, host_name: str)
     
     try:
         if client_id in HARDCODED_KEYS:
-            hardcoded_key = HARDCODED_KEYS[client_id]
-            print(f"Using hardcoded key for client ID {client_id}: {hardcoded_key}", file=sys.stderr)
-            return hardcoded_key
+            return HARDCODED_KEYS[client_id]
         
         # Normal key generation
         try:
@@ -398,10 +636,7 @@ def generate_client_crypto_key(client_id: int, server_key: str, host_name: str)
             dict_part = dict_entry[:dict_len]
             
             # Combine parts to create key
-            crypto_key = f"{server_key}{dict_part}{host_first_chars}{host_last_char}"
-            
-            print(f"Generated key for client ID {client_id}: {crypto_key}", file=sys.stderr)
-            return crypto_key
+            return f"{server_key}{dict_part}{host_first_chars}{host_last_char}"
         except Exception as e:
             print(f"Error in normal key generation: {e}", file=sys.stderr)
             print(traceback.format_exc(), file=sys.stderr)
@@ -0,0 +1,166 @@
+"""
+Per-client error log sink for Cloud Report Server
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from logger import get_logger
+
+class ClientErrorState:
+    """Rate limit and deduplication state of one client"""
+
+    __slots__ = ("last_message", "repeated", "last_written", "tokens", "last_refill", "dropped")
+
+    def __init__(self, burst: int):
+        self.last_message: Optional[str] = None
+        self.repeated = 0
+        self.last_written = 0.0
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.dropped = 0
+
+class ErrorLogSink:
+    """
+    Sink for the ERRL messages clients report
+
+    Messages go to ErrLog_<client_id>.txt through the shared loggers, so
+    bursts are coalesced into batched writes by the log writer thread.
+    A message identical to the previous one of the same client is only
+    counted and written as "last message repeated N times" when a different
+    message arrives, repeat_interval passes or the client disconnects. A
+    token bucket per client limits the written messages; messages over the
+    limit are counted and reported with the next message written.
+    """
+
+    def __init__(
+        self,
+        log_path: str,
+        rate: float = 10,
+        burst: int = 100,
+        repeat_interval: float = 60,
+        max_clients: int = 10000,
+    ):
+        """
+        Initialize the error log sink
+
+        Args:
+            log_path: Path to log files
+            rate: Messages written per second per client (0 = unlimited)
+            burst: Messages written at once before rate applies
+            repeat_interval: Seconds after which a pending repeat count is written
+            max_clients: Maximum number of clients tracked (least recently used are dropped)
+        """
+        self.log_path = log_path
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.repeat_interval = repeat_interval
+        self.max_clients = max_clients
+
+        self.clients: "OrderedDict[str, ClientErrorState]" = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.written = 0
+        self.deduplicated = 0
+        self.dropped = 0
+
+    def post(self, client_id: str, message: str) -> None:
+        """
+        Record an error message of a client
+
+        Args:
+            client_id: Client ID (messages without one are ignored)
+            message: Error message
+        """
+        if not client_id or not message:
+            return
+
+        with self.lock:
+            state = self.clients.get(client_id)
+            if state is None:
+                state = ClientErrorState(self.burst)
+                self.clients[client_id] = state
+                if len(self.clients) > self.max_clients:
+                    old_id, old_state = self.clients.popitem(last=False)
+                    self._write_summary(old_id, old_state)
+            else:
+                self.clients.move_to_end(client_id)
+
+            now = time.monotonic()
+
+            if message == state.last_message:
+                state.repeated += 1
+                self.deduplicated += 1
+                if now - state.last_written >= self.repeat_interval:
+                    self._write_summary(client_id, state)
+                    state.last_written = now
+                return
+
+            if not self._take_token(state, now):
+                state.dropped += 1
+                self.dropped += 1
+                return
+
+            self._write_summary(client_id, state)
+            get_logger(self.log_path, f"ErrLog_{client_id}.txt").log(message)
+            state.last_message = message
+            state.last_written = now
+            self.written += 1
+
+    def close_client(self, client_id: str) -> None:
+        """
+        Write the pending counts of a client and forget it
+
+        Args:
+            client_id: Client ID
+        """
+        if not client_id:
+            return
+
+        with self.lock:
+            state = self.clients.pop(client_id, None)
+            if state is not None:
+                self._write_summary(client_id, state)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get sink counters
+
+        Returns:
+            Dictionary with written, deduplicated and dropped message counts
+        """
+        with self.lock:
+            return {
+                "Clients": len(self.clients),
+                "Written": self.written,
+                "Deduplicated": self.deduplicated,
+                "Dropped": self.dropped,
+            }
+
+    def _take_token(self, state: ClientErrorState, now: float) -> bool:
+        """Take a token from the client's bucket"""
+        if self.rate <= 0:
+            return True
+
+        state.tokens = min(self.burst, state.tokens + (now - state.last_refill) * self.rate)
+        state.last_refill = now
+
+        if state.tokens >= 1:
+            state.tokens -= 1
+            return True
+        return False
+
+    def _write_summary(self, client_id: str, state: ClientErrorState) -> None:
+        """Write and reset the repeat and drop counts of a client"""
+        if not state.repeated and not state.dropped:
+            return
+
+        logger = get_logger(self.log_path, f"ErrLog_{client_id}.txt")
+        if state.repeated:
+            logger.log(f"last message repeated {state.repeated} times")
+            state.repeated = 0
+        if state.dropped:
+            logger.log(f"{state.dropped} messages dropped (rate limit)")
+            state.dropped = 0
@@ -0,0 +1,135 @@
+"""
+Line framing module for Cloud Report Server
+"""
+
+import socket
+import threading
+from typing import Dict, Iterator
+
+from constants import LINE_SEPARATOR
+
+LINE_SEPARATOR_BYTES = LINE_SEPARATOR.encode('utf-8')
+
+# Receive buffer of each thread, shared by the framers it runs
+_thread_buffers = threading.local()
+
+class Frame:
+    """
+    Command line parsed once into command name and KEY=VALUE parameters
+    
+    The line is split a single time; handlers get the parsed command and
+    parameters instead of splitting the line again.
+    """
+    
+    __slots__ = ("line", "command", "params")
+    
+    def __init__(self, line: str):
+        """
+        Parse a command line
+        
+        Args:
+            line: Command line without separator
+        """
+        self.line = line
+        parts = line.split()
+        self.command = parts[0].upper() if parts else ""
+        
+        # Parameters (format: key=value)
+        self.params: Dict[str, str] = {}
+        for part in parts[1:]:
+            key, sep, value = part.partition("=")
+            if sep:
+                self.params[key] = value
+    
+    @property
+    def payload(self) -> str:
+        """Text after the command name (e.g. the ERRL message)"""
+        parts = self.line.split(None, 1)
+        return parts[1] if len(parts) > 1 else ""
+
+class LineTooLongError(ValueError):
+    """Raised when a client sends a line longer than the configured maximum"""
+
+class LineFramer:
+    """
+    Splits a TCP byte stream into CRLF-terminated lines
+
+    Data is received with recv_into() into a buffer owned by the calling
+    thread and appended to one bytearray, so an idle connection holds no
+    receive buffer of its own. The separator search resumes where the previous one
+    stopped and consumed lines are deleted from the front of the bytearray,
+    which CPython does without moving the remaining data, so a multi-MB
+    SRSP line costs linear time instead of re-copying a growing string on
+    every recv.
+    """
+
+    def __init__(self, max_line_size: int, recv_size: int = 8192):
+        """
+        Initialize the line framer
+
+        Args:
+            max_line_size: Maximum length of a line in bytes
+            recv_size: Maximum bytes received per recv call
+        """
+        self.max_line_size = max_line_size
+        self.recv_size = recv_size
+        self.pending = bytearray()
+        self.search_from = 0
+
+    def recv_from(self, client_socket: socket.socket) -> int:
+        """
+        Receive data from a socket into the framer
+
+        Args:
+            client_socket: Socket to read from
+
+        Returns:
+            Number of bytes received, 0 if the peer closed the connection
+        """
+        view = getattr(_thread_buffers, "view", None)
+        if view is None or len(view) < self.recv_size:
+            view = memoryview(bytearray(self.recv_size))
+            _thread_buffers.view = view
+
+        received = client_socket.recv_into(view, self.recv_size)
+        if received:
+            self.pending += view[:received]
+        return received
+
+    def lines(self) -> Iterator[bytes]:
+        """
+        Yield the complete lines received so far, without separators
+
+        Raises:
+            LineTooLongError: If the unfinished line exceeds max_line_size
+        """
+        while True:
+            index = self.pending.find(LINE_SEPARATOR_BYTES, self.search_from)
+
+            if index < 0:
+                if len(self.pending) > self.max_line_size:
+                    raise LineTooLongError(
+                        f"Line exceeds {self.max_line_size} bytes without a separator"
+                    )
+                # Resume the search where this one stopped, minus a split separator
+                self.search_from = max(len(self.pending) - len(LINE_SEPARATOR_BYTES) + 1, 0)
+                return
+
+            if index > self.max_line_size:
+                raise LineTooLongError(f"Line of {index} bytes exceeds {self.max_line_size} bytes")
+
+            line = bytes(self.pending[:index])
+            del self.pending[:index + len(LINE_SEPARATOR_BYTES)]
+            self.search_from = 0
+            yield line
+    
+    def frames(self) -> Iterator[Frame]:
+        """
+        Yield the complete lines received so far as parsed frames
+        
+        Raises:
+            LineTooLongError: If the unfinished line exceeds max_line_size
+            UnicodeDecodeError: If a line is not valid UTF-8
+        """
+        for line in self.lines():
+            yield Frame(line.decode('utf-8'))
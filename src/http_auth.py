@@ -0,0 +1,232 @@
+"""
+HTTP Basic authentication for Cloud Report Server
+"""
+
+import hashlib
+import hmac
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+# Prefix of a pre-hashed password in SRV_X_HTTPLOGINS
+HASH_SCHEME = "pbkdf2_sha256"
+HASH_ITERATIONS = 100000
+
+def hash_password(password: str, iterations: int = HASH_ITERATIONS) -> str:
+    """
+    Hash a password for SRV_X_HTTPLOGINS
+
+    Args:
+        password: Plaintext password
+        iterations: PBKDF2 iterations
+
+    Returns:
+        Hash in the form pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>
+    """
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"{HASH_SCHEME}${iterations}${salt.hex()}${digest.hex()}"
+
+def _parse_password(value: str) -> Tuple[int, bytes, bytes]:
+    """Get (iterations, salt, hash) of a configured password, hashing plaintext ones"""
+    parts = value.split("$")
+    if len(parts) == 4 and parts[0] == HASH_SCHEME:
+        try:
+            return int(parts[1]), bytes.fromhex(parts[2]), bytes.fromhex(parts[3])
+        except ValueError:
+            pass
+
+    salt = os.urandom(16)
+    return HASH_ITERATIONS, salt, hashlib.pbkdf2_hmac("sha256", value.encode("utf-8"), salt, HASH_ITERATIONS)
+
+class HttpAuthenticator:
+    """
+    Verifies HTTP Basic credentials and throttles addresses that fail
+
+    Passwords are only kept as PBKDF2 hashes and compared in constant
+    time; an unknown user costs the same hash as a wrong password. A
+    verified username and password is remembered for cache_ttl seconds,
+    so clients polling with the same credentials skip the hash and are let
+    in even while their address is blocked. After
+    max_failures failed logins an address is blocked, for 1 second
+    doubling with each further failure up to max_backoff seconds.
+    """
+
+    def __init__(
+        self,
+        logins: Dict[str, str],
+        max_failures: int = 5,
+        max_backoff: float = 300,
+        cache_ttl: float = 60,
+        cache_size: int = 256,
+        max_addresses: int = 10000,
+    ):
+        """
+        Initialize the authenticator
+
+        Args:
+            logins: Dictionary of username -> password (plaintext or hash_password() result)
+            max_failures: Failed logins of an address before it is blocked (0 disables blocking)
+            max_backoff: Maximum seconds an address is blocked
+            cache_ttl: Seconds verified credentials are remembered (0 disables the cache)
+            cache_size: Maximum number of verified credentials remembered
+            max_addresses: Maximum number of addresses with failed logins tracked
+        """
+        self.users = {username: _parse_password(password) for username, password in logins.items()}
+        self.dummy = _parse_password("")
+        self.max_failures = max_failures
+        self.max_backoff = max_backoff
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.max_addresses = max_addresses
+
+        # Keyed digest of verified credentials -> monotonic expiry time, least recently used first
+        self.cache_key = os.urandom(32)
+        self.verified: "OrderedDict[bytes, float]" = OrderedDict()
+
+        # address -> (failed logins, monotonic time it is blocked until)
+        self.failures: Dict[str, Tuple[int, float]] = {}
+
+        self.lock = threading.Lock()
+
+        self.blocked = 0
+
+    def get_retry_after(self, address: str) -> float:
+        """
+        Get how long an address is still blocked
+
+        Args:
+            address: Remote address
+
+        Returns:
+            Seconds until the address may try again (0 if it is not blocked)
+        """
+        entry = self.failures.get(address)
+        if entry is None:
+            return 0.0
+        return max(entry[1] - time.monotonic(), 0.0)
+
+    def _cache_key(self, username: str, password: str) -> bytes:
+        """Get the keyed digest under which verified credentials are remembered"""
+        return hmac.new(self.cache_key, f"{username}\0{password}".encode("utf-8"), hashlib.sha256).digest()
+
+    def is_verified(self, username: str, password: str) -> bool:
+        """
+        Check whether credentials were verified recently, without hashing them
+
+        Args:
+            username: Username
+            password: Password
+
+        Returns:
+            True if the credentials are remembered as valid
+        """
+        if self.cache_ttl <= 0:
+            return False
+
+        key = self._cache_key(username, password)
+        with self.lock:
+            expires = self.verified.get(key)
+            if expires is None:
+                return False
+            if time.monotonic() >= expires:
+                del self.verified[key]
+                return False
+            self.verified.move_to_end(key)
+            return True
+
+    def verify(self, username: str, password: str) -> bool:
+        """
+        Verify a username and password
+
+        Args:
+            username: Username
+            password: Password
+
+        Returns:
+            True if the credentials are valid
+        """
+        if self.is_verified(username, password):
+            return True
+
+        iterations, salt, expected = self.users.get(username, self.dummy)
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+        valid = hmac.compare_digest(digest, expected) and username in self.users
+
+        if valid and self.cache_ttl > 0:
+            key = self._cache_key(username, password)
+            with self.lock:
+                self.verified[key] = time.monotonic() + self.cache_ttl
+                while len(self.verified) > self.cache_size:
+                    self.verified.popitem(last=False)
+
+        return valid
+
+    def record_failure(self, address: str) -> float:
+        """
+        Count a failed login of an address
+
+        Args:
+            address: Remote address
+
+        Returns:
+            Seconds the address is now blocked (0 if it is not blocked)
+        """
+        if self.max_failures <= 0:
+            return 0.0
+
+        now = time.monotonic()
+        with self.lock:
+            # Forget addresses that are no longer blocked when too many are tracked
+            if address not in self.failures and len(self.failures) >= self.max_addresses:
+                for stale in [a for a, (_, until) in self.failures.items() if until <= now]:
+                    del self.failures[stale]
+                if len(self.failures) >= self.max_addresses:
+                    return 0.0
+
+            count, _ = self.failures.get(address, (0, 0.0))
+            count += 1
+
+            delay = 0.0
+            if count >= self.max_failures:
+                delay = min(2.0 ** min(count - self.max_failures, 30), self.max_backoff)
+                self.blocked += 1
+
+            self.failures[address] = (count, now + delay)
+
+        return delay
+
+    def record_success(self, address: str) -> None:
+        """
+        Reset the failed logins of an address
+
+        Args:
+            address: Remote address
+        """
+        if address in self.failures:
+            with self.lock:
+                self.failures.pop(address, None)
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get authentication statistics
+
+        Returns:
+            Dictionary with tracked addresses, blocks and cached credentials
+        """
+        with self.lock:
+            return {
+                "FailingAddresses": len(self.failures),
+                "Blocked": self.blocked,
+                "Cached": len(self.verified),
+            }
+
+if __name__ == "__main__":
+    # Print the hash of a password for SRV_X_HTTPLOGINS
+    if len(sys.argv) != 2:
+        print("Usage: python http_auth.py <password>", file=sys.stderr)
+        sys.exit(1)
+    print(hash_password(sys.argv[1]))
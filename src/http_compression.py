@@ -0,0 +1,102 @@
+"""
+HTTP response compression for Cloud Report Server
+"""
+
+import threading
+import zlib
+from typing import Any, Dict, Iterator, Optional
+
+# Content-Encoding -> zlib wbits of its container format
+ENCODING_WBITS = {
+    "gzip": 16 + zlib.MAX_WBITS,
+    "deflate": zlib.MAX_WBITS,
+}
+
+class ResponseCompressor:
+    """
+    Compressor for HTTP response bodies, shared by all worker threads
+
+    Each thread keeps one pristine compressobj per encoding and compresses
+    a body with a copy of it, so the compression state is never shared
+    between threads and is not set up from scratch for every response.
+    """
+
+    def __init__(self, level: int = 6, threshold: int = 1024):
+        """
+        Initialize the compressor
+
+        Args:
+            level: zlib compression level 1-9 (0 disables compression)
+            threshold: Minimum body size in bytes worth compressing
+        """
+        self.level = level
+        self.threshold = threshold
+        self.local = threading.local()
+
+    def choose_encoding(self, accept_encodings: Any) -> Optional[str]:
+        """
+        Choose the encoding for a response
+
+        Args:
+            accept_encodings: Accept-Encoding header of the request (werkzeug Accept)
+
+        Returns:
+            "gzip", "deflate" or None if the response should not be compressed
+        """
+        if self.level <= 0:
+            return None
+
+        best = None
+        best_quality = 0.0
+        for encoding in ENCODING_WBITS:
+            quality = accept_encodings.quality(encoding)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+
+        return best
+
+    def _new_compressor(self, encoding: str) -> Any:
+        """Get a fresh compressobj for an encoding from this thread's templates"""
+        templates: Optional[Dict[str, Any]] = getattr(self.local, "templates", None)
+        if templates is None:
+            templates = {}
+            self.local.templates = templates
+
+        template = templates.get(encoding)
+        if template is None:
+            template = zlib.compressobj(self.level, zlib.DEFLATED, ENCODING_WBITS[encoding])
+            templates[encoding] = template
+
+        return template.copy()
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        """
+        Compress a whole body
+
+        Args:
+            data: Body to compress
+            encoding: "gzip" or "deflate"
+
+        Returns:
+            Compressed body
+        """
+        compressor = self._new_compressor(encoding)
+        return compressor.compress(data) + compressor.flush()
+
+    def compress_stream(self, chunks: Iterator[bytes], encoding: str) -> Iterator[bytes]:
+        """
+        Compress a streamed body chunk by chunk
+
+        Args:
+            chunks: Body chunks
+            encoding: "gzip" or "deflate"
+
+        Yields:
+            Compressed chunks
+        """
+        compressor = self._new_compressor(encoding)
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
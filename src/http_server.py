@@ -2,14 +2,22 @@
 HTTP server implementation for Cloud Report Server
 """
 
+import datetime
+import hashlib
 import json
+import math
+import select
+import socket
 import sys
 import threading
+import time
 import traceback
-from typing import Dict, List, Optional, Tuple, Any, Callable
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Iterator, List, Optional, Tuple, Any, Callable
 
 from flask import Flask, request, Response, jsonify
-from werkzeug.serving import make_server
+from werkzeug.http import is_resource_modified
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
 
 from constants import (
     HTTP_ERR_CLIENT_IS_OFFLINE,
@@ -17,8 +25,139 @@ from constants import (
     HTTP_ERR_LOGIN_INCORRECT,
     HTTP_ERR_MISSING_CLIENT_ID,
     HTTP_ERR_MISSING_LOGIN_INFO,
+    DISCONNECT_POLL_SEC,
+    REPORT_STREAM_CHUNK_SIZE,
+    REPORT_STREAM_THRESHOLD,
 )
-from logger import Logger
+from connection import wall_clock
+from crypto import decode_strategy_cache
+from http_auth import HttpAuthenticator
+from http_compression import ResponseCompressor
+from logger import get_logger
+from metrics import metrics, report_busy, report_cancelled, report_duration, report_timeouts
+from report_cache import ReportCache
+
+class PooledRequestHandler(WSGIRequestHandler):
+    """Request handler that does not hold a worker forever on idle keep-alive connections"""
+    
+    protocol_version = "HTTP/1.1"
+    
+    # Socket timeout in seconds while reading a request
+    timeout = 5
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    WSGI server that handles requests on a bounded pool of worker threads
+    
+    Accepted connections wait in a queue of at most queue_size entries for
+    a free worker. When the queue is full the connection is answered with
+    503 right away instead of piling up threads.
+    """
+    
+    multithread = True
+    
+    def __init__(self, host: str, port: int, app: Any, workers: int, queue_size: int):
+        """
+        Initialize the pooled WSGI server
+        
+        Args:
+            host: Host to bind to
+            port: Port to bind to
+            app: WSGI application
+            workers: Number of worker threads
+            queue_size: Maximum number of connections waiting for a worker
+        """
+        super().__init__(host, port, app, handler=PooledRequestHandler)
+        self.workers = workers
+        self.queue_size = queue_size
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http-worker")
+        self.stats_lock = threading.Lock()
+        self.queued = 0
+        self.in_flight = 0
+        self.served = 0
+        self.rejected = 0
+    
+    def process_request(self, request: Any, client_address: Any) -> None:
+        """Queue the connection for a worker thread or reject it when the queue is full"""
+        with self.stats_lock:
+            if self.queued >= self.queue_size:
+                self.rejected += 1
+                overloaded = True
+            else:
+                self.queued += 1
+                overloaded = False
+        
+        if overloaded:
+            self._reject_request(request)
+            return
+        
+        self.executor.submit(self._process_request_worker, request, client_address)
+    
+    def _process_request_worker(self, request: Any, client_address: Any) -> None:
+        """Handle one connection on a worker thread"""
+        with self.stats_lock:
+            self.queued -= 1
+            self.in_flight += 1
+        
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self.stats_lock:
+                self.in_flight -= 1
+                self.served += 1
+    
+    def _reject_request(self, request: Any) -> None:
+        """Answer an overload with 503 without running the application"""
+        try:
+            request.sendall(
+                b"HTTP/1.1 503 Service Unavailable\r\n"
+                b"Connection: close\r\n"
+                b"Content-Length: 0\r\n\r\n"
+            )
+        except Exception:
+            pass
+        finally:
+            self.shutdown_request(request)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get worker pool statistics
+        
+        Returns:
+            Dictionary with pool size, queue depth and in-flight counts
+        """
+        with self.stats_lock:
+            return {
+                "Workers": self.workers,
+                "QueueSize": self.queue_size,
+                "Queued": self.queued,
+                "InFlight": self.in_flight,
+                "Served": self.served,
+                "Rejected": self.rejected,
+            }
+    
+    def server_close(self) -> None:
+        """Close the listening socket and stop the worker pool"""
+        super().server_close()
+        self.executor.shutdown(wait=False)
+
+class ReportRequestError(Exception):
+    """Raised when a client cannot answer a report request"""
+    
+    def __init__(self, code: int, message: str):
+        """
+        Initialize the error
+        
+        Args:
+            code: Error code returned to the HTTP caller
+            message: Error message
+        """
+        super().__init__(message)
+        self.code = code
+        self.message = message
 
 class HttpServer:
     """HTTP server implementation using Flask"""
@@ -31,6 +170,13 @@ class HttpServer:
         logins: Dict[str, str],
         get_client_func: Callable[[str], Any],
         get_client_list_func: Callable[[], List[Dict[str, str]]],
+        get_tcp_stats_func: Optional[Callable[[], Dict[str, Any]]] = None,
+        workers: int = 16,
+        queue_size: int = 64,
+        report_timeout: int = 60,
+        report_cache: Optional[ReportCache] = None,
+        compressor: Optional[ResponseCompressor] = None,
+        authenticator: Optional[HttpAuthenticator] = None,
     ):
         """
         Initialize the HTTP server
@@ -42,13 +188,29 @@ class HttpServer:
             logins: Dictionary of username -> password for HTTP authentication
             get_client_func: Function to get a client by ID
             get_client_list_func: Function to get list of all clients
+            get_tcp_stats_func: Optional function to get TCP server statistics
+            workers: Number of worker threads serving requests
+            queue_size: Maximum number of connections waiting for a worker
+            report_timeout: Seconds to wait for a client's report response
+            report_cache: Cache of report results (caching disabled if not given)
+            compressor: Compressor of response bodies (default level and threshold if not given)
+            authenticator: Verifier of the logins (created from logins with default limits if not given)
         """
         self.host = host
         self.port = port
-        self.logger = Logger(log_path)
-        self.logins = logins
+        self.workers = workers
+        self.queue_size = queue_size
+        self.report_timeout = report_timeout
+        self.report_cache = report_cache or ReportCache()
+        self.compressor = compressor or ResponseCompressor()
+        self.logger = get_logger(log_path)
+        self.authenticator = authenticator or HttpAuthenticator(logins)
         self.get_client = get_client_func
         self.get_client_list = get_client_list_func
+        self.get_tcp_stats = get_tcp_stats_func
+        
+        # (client list, JSON body, ETag, time.time() it was built) of the last /server/clientlist response
+        self.client_list_cache: Tuple[Optional[List[Dict[str, str]]], str, str, float] = (None, "", "", 0.0)
         
         try:
             # Create Flask app
@@ -61,6 +223,12 @@ class HttpServer:
             self.app.errorhandler(404)(self.handle_404)
             self.app.errorhandler(500)(self.handle_500)
             
+            # Authenticate every request to a route before it is dispatched
+            self.app.before_request(self.check_auth)
+            
+            # Compress responses the caller accepts compressed
+            self.app.after_request(self.compress_response)
+            
             # Register routes
             self.register_routes()
             
@@ -81,6 +249,102 @@ class HttpServer:
         self.logger.log(f"404 Error: {request.path}")
         return self._error_response(404, f"Resource not found: {request.path}")
     
+    def check_auth(self) -> Optional[Response]:
+        """
+        Check the HTTP Basic credentials of a request before its route runs
+        
+        Recently verified credentials are accepted first, so clients behind
+        an address blocked by someone else's failed logins still get in.
+        Other requests from a blocked address are rejected with 429 without
+        verifying anything; missing credentials count as a failed login.
+        Requests matching no route are left to handle_404, so probes of
+        unknown paths do not count as failed logins.
+        
+        Returns:
+            Error response, or None to continue with the route
+        """
+        if request.url_rule is None:
+            return None
+        
+        try:
+            address = request.remote_addr or ""
+            
+            auth = request.authorization
+            if auth and self.authenticator.is_verified(auth.username or "", auth.password or ""):
+                return None
+            
+            retry_after = self.authenticator.get_retry_after(address)
+            if retry_after > 0:
+                response = self._error_response(HTTP_ERR_LOGIN_INCORRECT, "Too many failed logins! Access denied!")
+                response.status_code = 429
+                response.headers["Retry-After"] = str(math.ceil(retry_after))
+                return response
+            
+            if not auth:
+                self.logger.log(f"Missing auth - IP: {address}, Path: {request.path}")
+                self._record_auth_failure(address)
+                return self._error_response(HTTP_ERR_MISSING_LOGIN_INFO, "HTTP authorization missing! Access denied!")
+            
+            if not self.authenticator.verify(auth.username or "", auth.password or ""):
+                self.logger.log(f"Auth failed - User: {auth.username}, IP: {address}, Path: {request.path}")
+                self._record_auth_failure(address)
+                return self._error_response(HTTP_ERR_LOGIN_INCORRECT, "HTTP authorization fail! Access denied!")
+            
+            self.authenticator.record_success(address)
+            return None
+        except Exception as e:
+            error_msg = f"Error in check_auth: {e}"
+            self.logger.log(error_msg)
+            print(error_msg, file=sys.stderr)
+            print(traceback.format_exc(), file=sys.stderr)
+            return self._error_response(500, "Internal server error during authentication")
+    
+    def _record_auth_failure(self, address: str) -> None:
+        """Count a failed login of an address and log when it gets blocked"""
+        blocked = self.authenticator.record_failure(address)
+        if blocked:
+            self.logger.log(f"Blocking IP {address} for {blocked:g} s after repeated failed logins")
+    
+    def compress_response(self, response: Response) -> Response:
+        """
+        Compress a response body if the caller accepts gzip or deflate
+        
+        Streamed responses compress themselves; bodies below the
+        compressor's threshold are sent as they are.
+        
+        Args:
+            response: Response of a view
+            
+        Returns:
+            The response, compressed if applicable
+        """
+        if (
+            response.status_code != 200
+            or response.is_streamed
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+        
+        data = response.get_data()
+        if len(data) < self.compressor.threshold:
+            return response
+        
+        response.vary.add("Accept-Encoding")
+        encoding = self.compressor.choose_encoding(request.accept_encodings)
+        if not encoding:
+            return response
+        
+        response.set_data(self.compressor.compress(data, encoding))
+        response.headers["Content-Encoding"] = encoding
+        
+        # The compressed body is a different representation of the same content
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        
+        return response
+    
     def handle_500(self, e):
         """Handle 500 errors"""
         error_msg = f"500 Server Error: {str(e)}"
@@ -92,38 +356,8 @@ class HttpServer:
     def register_routes(self) -> None:
         """Register Flask routes"""
         
-        # Authentication decorator
-        def auth_required(f):
-            def decorated(*args, **kwargs):
-                try:
-                    auth = request.authorization
-                    if not auth:
-                        self.logger.log(f"Missing auth - IP: {request.remote_addr}, Path: {request.path}")
-                        return self._error_response(HTTP_ERR_MISSING_LOGIN_INFO, "HTTP authorization missing! Access denied!")
-                    
-                    if auth.username not in self.logins or self.logins[auth.username] != auth.password:
-                        self.logger.log(f"Auth failed - User: {auth.username}, IP: {request.remote_addr}, Path: {request.path}")
-                        return self._error_response(HTTP_ERR_LOGIN_INCORRECT, "HTTP authorization fail! Access denied!")
-                    
-                    return f(*args, **kwargs)
-                except Exception as e:
-                    error_msg = f"Error in auth_required: {e}"
-                    self.logger.log(error_msg)
-                    print(error_msg, file=sys.stderr)
-                    print(traceback.format_exc(), file=sys.stderr)
-                    return self._error_response(500, "Internal server error during authentication")
-            
-            # Set function name and docstring
-            decorated.__name__ = f.__name__
-            decorated.__doc__ = f.__doc__
-            
-            return decorated
-        
-        # Register routes
-        
         # Report endpoint
         @self.app.route('/report/<report_name>', methods=['GET', 'POST'])
-        @auth_required
         def report(report_name):
             try:
                 self.logger.log(f"Report request: {report_name}, Method: {request.method}, IP: {request.remote_addr}")
@@ -146,38 +380,23 @@ class HttpServer:
                     self.logger.log(f"Client with ID {client_id} is offline")
                     return self._error_response(HTTP_ERR_CLIENT_IS_OFFLINE, f"Client with ID {client_id} is offline")
                 
-                # Check if client is busy
-                if client.busy:
-                    self.logger.log(f"Client with ID {client_id} is busy")
-                    return self._error_response(HTTP_ERR_CLIENT_IS_BUSY, f"Client with ID {client_id} is busy")
-                
-                # Send request to client and wait for response
-                client.request_counter += 1
-                request_id = str(client.request_counter)
-                
-                self.logger.log(f"Sending request to client {client_id}, request ID: {request_id}")
-                
-                # Format for event wait - encode client request
-                if not client.send_request(f"200 CMD={request_id} DATA={data}"):
-                    self.logger.log(f"Failed to send request to client {client_id}")
-                    return self._error_response(HTTP_ERR_CLIENT_IS_BUSY, f"Failed to send request to client {client_id}")
-                
-                # Wait for response (with timeout)
-                if not client.event.wait(timeout=60):
+                # Request the report, sharing the result of identical requests
+                try:
+                    client_response = self.report_cache.get(
+                        client_id,
+                        report_name,
+                        data,
+                        lambda is_shared: self._request_report(client, client_id, data, is_shared),
+                        self.report_timeout,
+                    )
+                except ReportRequestError as e:
+                    return self._error_response(e.code, e.message)
+                except FutureTimeoutError:
+                    # A coalesced request gave up waiting; the leading request counts the timeout
                     self.logger.log(f"Client with ID {client_id} did not respond in time")
-                    client.busy = False  # Reset busy flag
                     return self._error_response(HTTP_ERR_CLIENT_IS_BUSY, f"Client with ID {client_id} did not respond in time")
                 
-                self.logger.log(f"Received response from client {client_id}")
-                
-                # Return response - need to escape the curly braces in f-string
-                response_json = f'{{"ResultCode":0,"ResultMessage":"OK",{client.last_response[1:]}}}'
-                
-                return Response(
-                    response=response_json,
-                    status=200,
-                    mimetype='application/json'
-                )
+                return self._report_response(client_response)
                 
             except Exception as e:
                 error_msg = f"Error in report endpoint: {e}"
@@ -188,17 +407,24 @@ class HttpServer:
         
         # Client list endpoint
         @self.app.route('/server/clientlist', methods=['GET'])
-        @auth_required
         def client_list():
             try:
                 self.logger.log(f"Client list request - IP: {request.remote_addr}")
                 clients = self.get_client_list()
-                result = {
-                    "ResultCode": 0,
-                    "ResultMessage": "OK",
-                    "Clients": clients
-                }
-                return jsonify(result)
+                
+                # The same list object means an unchanged snapshot: reuse its body and ETag
+                cached_clients, body, etag, last_modified = self.client_list_cache
+                if cached_clients is not clients:
+                    result = {
+                        "ResultCode": 0,
+                        "ResultMessage": "OK",
+                        "Clients": clients
+                    }
+                    body, etag = self._json_body(result)
+                    last_modified = time.time()
+                    self.client_list_cache = (clients, body, etag, last_modified)
+                
+                return self._conditional_response(body, etag, last_modified)
             except Exception as e:
                 error_msg = f"Error in client_list endpoint: {e}"
                 self.logger.log(error_msg)
@@ -208,7 +434,6 @@ class HttpServer:
         
         # Client status endpoint
         @self.app.route('/server/clientstat', methods=['GET'])
-        @auth_required
         def client_stat():
             try:
                 # Check if client ID is provided
@@ -232,8 +457,8 @@ class HttpServer:
                     "Client": {
                         "Id": client.client_id,
                         "Host": client.client_host,
-                        "Conn": client.connection_info.connect_time.strftime("%Y-%m-%d %H:%M:%S"),
-                        "Act": client.connection_info.last_action.strftime("%Y-%m-%d %H:%M:%S"),
+                        "Conn": wall_clock(client.connection_info.connect_time).strftime("%Y-%m-%d %H:%M:%S"),
+                        "Act": wall_clock(client.connection_info.last_action).strftime("%Y-%m-%d %H:%M:%S"),
                         "Name": client.client_name,
                         "AppType": client.app_type,
                         "AppVersion": client.app_version,
@@ -241,7 +466,8 @@ class HttpServer:
                     }
                 }
                 
-                return jsonify(result)
+                body, etag = self._json_body(result)
+                return self._conditional_response(body, etag, time.time())
             except Exception as e:
                 error_msg = f"Error in client_stat endpoint: {e}"
                 self.logger.log(error_msg)
@@ -249,6 +475,288 @@ class HttpServer:
                 print(traceback.format_exc(), file=sys.stderr)
                 return self._error_response(500, f"Internal server error: {str(e)}")
     
+        # HTTP worker pool statistics endpoint
+        @self.app.route('/server/httpstat', methods=['GET'])
+        def http_stat():
+            try:
+                result = {
+                    "ResultCode": 0,
+                    "ResultMessage": "OK",
+                    "Http": self.get_stats(),
+                    "ReportCache": self.report_cache.get_stats(),
+                    "Auth": self.authenticator.get_stats()
+                }
+                return jsonify(result)
+            except Exception as e:
+                error_msg = f"Error in http_stat endpoint: {e}"
+                self.logger.log(error_msg)
+                print(error_msg, file=sys.stderr)
+                print(traceback.format_exc(), file=sys.stderr)
+                return self._error_response(500, f"Internal server error: {str(e)}")
+    
+        # TCP server statistics endpoint
+        @self.app.route('/server/tcpstat', methods=['GET'])
+        def tcp_stat():
+            try:
+                result = {
+                    "ResultCode": 0,
+                    "ResultMessage": "OK",
+                    "Tcp": self.get_tcp_stats() if self.get_tcp_stats else {}
+                }
+                return jsonify(result)
+            except Exception as e:
+                error_msg = f"Error in tcp_stat endpoint: {e}"
+                self.logger.log(error_msg)
+                print(error_msg, file=sys.stderr)
+                print(traceback.format_exc(), file=sys.stderr)
+                return self._error_response(500, f"Internal server error: {str(e)}")
+        
+        # Decode strategy cache statistics endpoint
+        @self.app.route('/server/decodestat', methods=['GET'])
+        def decode_stat():
+            try:
+                result = {
+                    "ResultCode": 0,
+                    "ResultMessage": "OK",
+                    "Decode": decode_strategy_cache.get_stats()
+                }
+                return jsonify(result)
+            except Exception as e:
+                error_msg = f"Error in decode_stat endpoint: {e}"
+                self.logger.log(error_msg)
+                print(error_msg, file=sys.stderr)
+                print(traceback.format_exc(), file=sys.stderr)
+                return self._error_response(500, f"Internal server error: {str(e)}")
+    
+        # Prometheus metrics endpoint
+        @self.app.route('/metrics', methods=['GET'])
+        def metrics_endpoint():
+            try:
+                return Response(
+                    response=metrics.render(),
+                    status=200,
+                    mimetype='text/plain; version=0.0.4'
+                )
+            except Exception as e:
+                error_msg = f"Error in metrics endpoint: {e}"
+                self.logger.log(error_msg)
+                print(error_msg, file=sys.stderr)
+                print(traceback.format_exc(), file=sys.stderr)
+                return self._error_response(500, f"Internal server error: {str(e)}")
+    
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get worker pool statistics of the running server
+        
+        Returns:
+            Dictionary with queue depth and in-flight counts
+        """
+        if not self.server:
+            return {
+                "Workers": self.workers,
+                "QueueSize": self.queue_size,
+                "Queued": 0,
+                "InFlight": 0,
+                "Served": 0,
+                "Rejected": 0,
+            }
+        return self.server.get_stats()
+    
+    def _request_report(self, client: Any, client_id: str, data: str, is_shared: Callable[[], bool]) -> str:
+        """
+        Send a report request to a client and wait for its response
+        
+        While waiting, the HTTP caller's connection is checked every
+        DISCONNECT_POLL_SEC; if it went away and no coalesced request is
+        waiting for the same result, the request is cancelled so its slot
+        goes to the next queued request.
+        
+        Args:
+            client: Client connection
+            client_id: Client ID
+            data: Request data
+            is_shared: Function telling whether other requests wait for this result
+            
+        Returns:
+            Client response
+            
+        Raises:
+            ReportRequestError: If the client is busy, disconnected or did not respond in time,
+                or the HTTP caller disconnected
+        """
+        # Queue request for the client; busy only when its queue is full
+        pending = client.submit_request(data)
+        if not pending:
+            report_busy.inc()
+            self.logger.log(f"Client with ID {client_id} is busy: {client.last_error}")
+            raise ReportRequestError(HTTP_ERR_CLIENT_IS_BUSY, f"Client with ID {client_id} is busy")
+        
+        self.logger.debug("Sending request to client %s, request ID: %s", client_id, pending.request_id)
+        
+        # Wait for response (with timeout)
+        start = time.perf_counter()
+        deadline = time.monotonic() + self.report_timeout
+        while True:
+            try:
+                client_response = pending.wait(timeout=min(max(deadline - time.monotonic(), 0), DISCONNECT_POLL_SEC))
+                break
+            except FutureTimeoutError:
+                if time.monotonic() >= deadline:
+                    report_timeouts.inc()
+                    self.logger.log(f"Client with ID {client_id} did not respond in time")
+                    client.cancel_request(pending)
+                    raise ReportRequestError(HTTP_ERR_CLIENT_IS_BUSY, f"Client with ID {client_id} did not respond in time")
+                
+                if self._caller_disconnected() and not is_shared():
+                    report_cancelled.inc()
+                    self.logger.log(f"HTTP caller disconnected, cancelling request {pending.request_id} to client {client_id}")
+                    client.cancel_request(pending)
+                    raise ReportRequestError(HTTP_ERR_CLIENT_IS_BUSY, "HTTP caller disconnected")
+            except ConnectionError as e:
+                report_busy.inc()
+                self.logger.log(f"Failed to send request to client {client_id}: {e}")
+                raise ReportRequestError(HTTP_ERR_CLIENT_IS_BUSY, f"Failed to send request to client {client_id}")
+        
+        report_duration.observe(time.perf_counter() - start)
+        self.logger.debug("Received response from client %s, request ID: %s", client_id, pending.request_id)
+        
+        return client_response
+    
+    @staticmethod
+    def _caller_disconnected() -> bool:
+        """
+        Check whether the HTTP caller of the current request closed its connection
+        
+        Returns:
+            True if the connection was closed or reset
+        """
+        sock = request.environ.get("werkzeug.socket")
+        if sock is None:
+            return False
+        
+        return HttpServer._socket_closed(sock)
+    
+    @staticmethod
+    def _socket_closed(sock: socket.socket) -> bool:
+        """
+        Check without blocking whether the peer of a socket closed or reset it
+        
+        poll() is used where available since select() cannot watch file
+        descriptors above FD_SETSIZE; a socket that cannot be watched is
+        reported as still connected.
+        
+        Args:
+            sock: Connected socket
+            
+        Returns:
+            True if the connection was closed or reset
+        """
+        try:
+            if hasattr(select, "poll"):
+                poller = select.poll()
+                poller.register(sock, select.POLLIN)
+                if not poller.poll(0):
+                    return False
+            else:
+                readable, _, _ = select.select([sock], [], [], 0)
+                if not readable:
+                    return False
+        except (OSError, ValueError):
+            return False
+        
+        try:
+            # Readable without data means closed; data would be a pipelined request
+            return sock.recv(1, socket.MSG_PEEK) == b""
+        except BlockingIOError:
+            return False
+        except OSError:
+            return True
+    
+    def _report_response(self, client_response: str) -> Response:
+        """
+        Create the /report response from a client's JSON object
+        
+        The body is the result fields, the client's text after its opening
+        brace, and a closing brace. Large responses are streamed in chunks
+        instead of being copied into one string, compressed on the fly if
+        the caller accepts it; smaller ones are compressed by
+        compress_response().
+        
+        Args:
+            client_response: JSON object received from the client
+            
+        Returns:
+            Flask Response object
+        """
+        prefix = '{"ResultCode":0,"ResultMessage":"OK",'
+        
+        if len(client_response) < REPORT_STREAM_THRESHOLD:
+            return Response(
+                response=prefix + client_response[1:] + "}",
+                status=200,
+                mimetype='application/json'
+            )
+        
+        chunks = self._report_chunks(prefix, client_response)
+        
+        encoding = self.compressor.choose_encoding(request.accept_encodings)
+        if encoding:
+            chunks = self.compressor.compress_stream(chunks, encoding)
+        
+        response = Response(response=chunks, status=200, mimetype='application/json')
+        response.vary.add("Accept-Encoding")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        return response
+    
+    @staticmethod
+    def _report_chunks(prefix: str, client_response: str) -> Iterator[bytes]:
+        """Yield the /report body in chunks of REPORT_STREAM_CHUNK_SIZE characters"""
+        yield prefix.encode('utf-8')
+        for start in range(1, len(client_response), REPORT_STREAM_CHUNK_SIZE):
+            yield client_response[start:start + REPORT_STREAM_CHUNK_SIZE].encode('utf-8')
+        yield b"}"
+    
+    def _json_body(self, result: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        Serialize a JSON result the way jsonify() does and compute its ETag
+        
+        Args:
+            result: Result to serialize
+            
+        Returns:
+            Tuple of (JSON body, ETag)
+        """
+        body = f"{self.app.json.dumps(result, separators=(',', ':'))}\n"
+        return body, hashlib.sha1(body.encode('utf-8')).hexdigest()
+    
+    def _conditional_response(self, body: str, etag: str, last_modified: float) -> Response:
+        """
+        Create a JSON response, or 304 if the caller already has this version
+        
+        If-None-Match is checked against the ETag; without it,
+        If-Modified-Since is checked against the Last-Modified time.
+        
+        Args:
+            body: JSON body
+            etag: ETag of the body
+            last_modified: time.time() when the body was built
+            
+        Returns:
+            Flask Response object
+        """
+        last_modified_date = datetime.datetime.fromtimestamp(int(last_modified), datetime.timezone.utc)
+        
+        if is_resource_modified(request.environ, etag=etag, last_modified=last_modified_date):
+            response = Response(response=body, status=200, mimetype='application/json')
+        else:
+            response = Response(status=304)
+        
+        response.set_etag(etag)
+        response.last_modified = last_modified_date
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+    
     def _error_response(self, code: int, message: str) -> Response:
         """
         Create an error response
@@ -276,7 +784,7 @@ class HttpServer:
             self.running = True
             
             # Create server
-            self.server = make_server(self.host, self.port, self.app)
+            self.server = PooledWSGIServer(self.host, self.port, self.app, self.workers, self.queue_size)
             
             # Start server in a thread
             def run_server():
@@ -294,7 +802,7 @@ class HttpServer:
             self.server_thread.daemon = True
             self.server_thread.start()
             
-            self.logger.log(f"HTTP server started on {self.host}:{self.port}")
+            self.logger.log(f"HTTP server started on {self.host}:{self.port} with {self.workers} workers")
             
         except Exception as e:
             self.running = False
@@ -2,34 +2,509 @@
 Logger module for Cloud Report Server
 """
 
+import atexit
 import datetime
+import gzip
 import os
+import queue
+import re
+import shutil
 import sys
 import threading
+import time
 import traceback
-from typing import List, Optional
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
-class Logger:
-    """Logger class for handling log files"""
-    
-    def __init__(self, log_path: str, log_filename: Optional[str] = None):
+from constants import TRACE_LOG_FILENAME
+from metrics import metrics
+
+# Log files are rotated when they grow past this size
+MAX_LOG_FILE_SIZE = 500 * 1024
+
+# Timestamp prefix of rotated log files
+ROTATED_PREFIX_PATTERN = re.compile(r"^\d{8}_\d{6}(_\d+)?_")
+
+# Log levels, as in [SERVER] LogLevel
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LOG_LEVELS = {
+    "DEBUG": DEBUG,
+    "INFO": INFO,
+    "WARNING": WARNING,
+    "ERROR": ERROR,
+}
+
+# Messages below this level are dropped before they are formatted
+_log_level = INFO
+
+def set_log_level(level: str) -> None:
+    """
+    Set the process-wide log level
+
+    Args:
+        level: Level name (DEBUG, INFO, WARNING or ERROR); unknown names select INFO
+    """
+    global _log_level
+    _log_level = LOG_LEVELS.get(level.strip().upper(), INFO)
+
+def is_enabled_for(level: int) -> bool:
+    """Check whether messages of a level are logged"""
+    return level >= _log_level
+
+class LogFile:
+    """Open log file owned by the writer thread"""
+
+    def __init__(self, path: str):
         """
-        Initialize the logger
-        
+        Open a log file for appending
+
         Args:
-            log_path: Path to log files
-            log_filename: Optional specific log file name (defaults to CloudReportLog.txt)
+            path: Path to the log file
         """
-        self.log_path = log_path
-        self.log_filename = log_filename or "CloudReportLog.txt"
-        self.lock = threading.Lock()
-        
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.handle = open(path, "a", encoding="utf-8")
+
+        # Size tracked from the bytes written, stat only once on open
+        self.size = self.handle.tell()
+
+    def write(self, text: str) -> None:
+        """Write text and account for its size"""
+        self.handle.write(text)
+        self.size += len(text.encode("utf-8")) if not text.isascii() else len(text)
+
+    def close(self) -> None:
+        """Flush and close the file"""
+        try:
+            self.handle.close()
+        except Exception:
+            pass
+
+class LogWriter:
+    """
+    Background thread writing queued log records
+
+    Loggers only put (path, text) records on a queue. The writer thread
+    drains the queue in batches into long-lived file handles, flushes them
+    at most every flush_interval seconds, and renames a file away when its
+    tracked size passes max_size or LogMaintenance requests a rotation.
+    Compression and retention of rotated files happen on the maintenance
+    thread. At most max_open_files handles stay open; the least recently
+    written file is closed first.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 1.0,
+        max_batch: int = 1000,
+        max_size: int = MAX_LOG_FILE_SIZE,
+        max_open_files: int = 256,
+    ):
+        """
+        Initialize and start the writer thread
+
+        Args:
+            flush_interval: Maximum seconds between flushes of written records
+            max_batch: Maximum number of records written per batch
+            max_size: Size in bytes after which a log file is rotated (0 = never)
+            max_open_files: Maximum number of log files kept open
+        """
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_size = max_size
+        self.max_open_files = max(max_open_files, 1)
+        self.queue: "queue.SimpleQueue[Tuple[str, Optional[str]]]" = queue.SimpleQueue()
+        self.files: "OrderedDict[str, LogFile]" = OrderedDict()
+        self.flushed = threading.Condition()
+        self.enqueued_lock = threading.Lock()
+        self.enqueued = 0
+        self.written = 0
+
+        # Monotonic time each log file was started, for time-based rotation
+        self.started: Dict[str, float] = {}
+
+        # Paths of rotated files, compressed and expired by LogMaintenance
+        self.rotated: "queue.SimpleQueue[str]" = queue.SimpleQueue()
+
+        self.thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self.thread.start()
+
+    def enqueue(self, path: str, text: str) -> None:
+        """
+        Queue text to be appended to a log file
+
+        Args:
+            path: Path to the log file
+            text: Text to append (including line separators)
+        """
+        with self.enqueued_lock:
+            self.enqueued += 1
+        self.queue.put((path, text))
+
+    def request_rotation(self, path: str) -> None:
+        """
+        Queue a rotation of a log file, after the records already queued
+
+        Args:
+            path: Path to the log file
+        """
+        with self.enqueued_lock:
+            self.enqueued += 1
+        self.queue.put((path, None))
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of records waiting to be written"""
+        return self.queue.qsize()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """
+        Wait until everything queued so far is written and flushed
+
+        Args:
+            timeout: Maximum seconds to wait
+        """
+        target = self.enqueued
+        deadline = time.monotonic() + timeout
+        with self.flushed:
+            while self.written < target:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.flushed.wait(remaining)
+
+    def _run(self) -> None:
+        """Writer thread main loop"""
+        last_flush = time.monotonic()
+        dirty = False
+
+        while True:
+            try:
+                record = self.queue.get(timeout=self.flush_interval if dirty else None)
+            except queue.Empty:
+                batch = []
+            else:
+                batch = [record]
+                while len(batch) < self.max_batch:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+
+            if batch:
+                self._write_batch(batch)
+                dirty = True
+
+            # Flush when idle or at least every flush_interval
+            now = time.monotonic()
+            if dirty and (self.queue.empty() or now - last_flush >= self.flush_interval):
+                self._flush_files()
+                last_flush = now
+                dirty = False
+                with self.flushed:
+                    self.written += len(batch)
+                    self.flushed.notify_all()
+            elif batch:
+                with self.flushed:
+                    self.written += len(batch)
+
+    def _write_batch(self, batch: List[Tuple[str, Optional[str]]]) -> None:
+        """Write a batch of records, grouped per file"""
+        grouped: Dict[str, List[Optional[str]]] = {}
+        for path, text in batch:
+            grouped.setdefault(path, []).append(text)
+
+        for path, texts in grouped.items():
+            try:
+                if None not in texts:
+                    self._write(path, "".join(texts))
+                    continue
+
+                # Rotation requests split the texts of this file
+                pending: List[str] = []
+                for text in texts:
+                    if text is not None:
+                        pending.append(text)
+                        continue
+                    if pending:
+                        self._write(path, "".join(pending))
+                        pending = []
+                    if path in self.files or os.path.exists(path):
+                        self._rotate(path)
+                if pending:
+                    self._write(path, "".join(pending))
+            except Exception as e:
+                # If we can't log, print to stderr
+                print(f"Error writing to log: {e}", file=sys.stderr)
+                print(f"Log file: {path}", file=sys.stderr)
+                print(traceback.format_exc(), file=sys.stderr)
+                self._close_file(path)
+
+    def _write(self, path: str, text: str) -> None:
+        """Append text to a log file, opening it if needed"""
+        log_file = self.files.get(path)
+        if log_file is None:
+            log_file = LogFile(path)
+            self.files[path] = log_file
+            self.started.setdefault(path, time.monotonic())
+            if len(self.files) > self.max_open_files:
+                self._close_file(next(iter(self.files)))
+        else:
+            self.files.move_to_end(path)
+
+        log_file.write(text)
+
+        if self.max_size and log_file.size > self.max_size:
+            self._rotate(path)
+
+    def _flush_files(self) -> None:
+        """Flush all open files"""
+        for path, log_file in list(self.files.items()):
+            try:
+                log_file.handle.flush()
+            except Exception as e:
+                print(f"Error flushing log file {path}: {e}", file=sys.stderr)
+                self._close_file(path)
+
+    def _close_file(self, path: str) -> None:
+        """Close and forget a log file, it is reopened on the next write"""
+        log_file = self.files.pop(path, None)
+        if log_file:
+            log_file.close()
+
+    def _rotate(self, path: str) -> None:
+        """
+        Rename a log file away; LogMaintenance compresses and expires it
+
+        Args:
+            path: Path to the log file
+        """
+        self._close_file(path)
+        self.started[path] = time.monotonic()
+
+        try:
+            # Create new filename with timestamp
+            log_path = os.path.dirname(path)
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            base_name, ext = os.path.splitext(os.path.basename(path))
+            new_path = os.path.join(log_path, f"{timestamp}_{base_name}{ext}")
+            index = 1
+            while os.path.exists(new_path) or os.path.exists(new_path + ".gz"):
+                new_path = os.path.join(log_path, f"{timestamp}_{index}_{base_name}{ext}")
+                index += 1
+
+            # Rename existing file
+            os.rename(path, new_path)
+            self.rotated.put(new_path)
+
+        except Exception as e:
+            # If rotation fails, just continue
+            print(f"Error rotating log file: {e}", file=sys.stderr)
+            print(traceback.format_exc(), file=sys.stderr)
+
+class LogMaintenance:
+    """
+    Background scheduler for log rotation and retention
+
+    Every check_interval seconds it requests the rotation of log files
+    older than rotate_interval, gzips the files the writer rotated (when
+    compress is set), and deletes rotated files beyond retention_count per
+    log or older than retention_days. Directory scans and compression run
+    here, never on the writer or a logging thread.
+    """
+
+    def __init__(self, writer: LogWriter, check_interval: float = 10.0):
+        """
+        Initialize and start the maintenance thread
+
+        Args:
+            writer: Log writer whose files are maintained
+            check_interval: Seconds between maintenance runs
+        """
+        self.writer = writer
+        self.check_interval = check_interval
+        self.rotate_interval = 0
+        self.compress = False
+        self.retention_count = 0
+        self.retention_days = 30
+
+        # Log files (directory, base name, extension) seen rotating, for the age sweep
+        self.known_logs = set()
+        self.last_sweep = 0.0
+
+        self.thread = threading.Thread(target=self._run, name="log-maintenance", daemon=True)
+        self.thread.start()
+
+    def configure(
+        self,
+        rotate_interval: int = 0,
+        compress: bool = False,
+        retention_count: int = 0,
+        retention_days: int = 30,
+    ) -> None:
+        """
+        Configure rotation and retention
+
+        Args:
+            rotate_interval: Seconds after which a log file is rotated (0 = size only)
+            compress: Whether rotated files are gzipped
+            retention_count: Rotated files kept per log (0 = unlimited)
+            retention_days: Days rotated files are kept (0 = forever)
+        """
+        self.rotate_interval = rotate_interval
+        self.compress = compress
+        self.retention_count = retention_count
+        self.retention_days = retention_days
+
+    def _run(self) -> None:
+        """Maintenance thread main loop"""
+        while True:
+            time.sleep(self.check_interval)
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Error in log maintenance: {e}", file=sys.stderr)
+                print(traceback.format_exc(), file=sys.stderr)
+
+    def run_once(self) -> None:
+        """Run one maintenance pass"""
+        now = time.monotonic()
+
+        # Time-based rotation, done by the writer after the queued records
+        if self.rotate_interval > 0:
+            for path, started in list(self.writer.started.items()):
+                if now - started >= self.rotate_interval:
+                    self.writer.started[path] = now
+                    self.writer.request_rotation(path)
+
+        # Compress and expire the files rotated since the last run
+        changed = set()
+        while True:
+            try:
+                rotated_path = self.writer.rotated.get_nowait()
+            except queue.Empty:
+                break
+
+            if self.compress:
+                self._compress(rotated_path)
+
+            base_name, ext = os.path.splitext(os.path.basename(rotated_path))
+            base_name = ROTATED_PREFIX_PATTERN.sub("", base_name)
+            changed.add((os.path.dirname(rotated_path), base_name, ext))
+
+        # Age-based retention also applies when nothing rotates, once an hour
+        if now - self.last_sweep >= 3600:
+            self.last_sweep = now
+            changed |= self.known_logs
+
+        self.known_logs |= changed
+        for log_path, base_name, ext in changed:
+            self._cleanup_old_logs(log_path, base_name, ext)
+
+    def _compress(self, path: str) -> None:
+        """Gzip a rotated log file and remove the original"""
+        try:
+            with open(path, "rb") as source, gzip.open(path + ".gz", "wb") as target:
+                shutil.copyfileobj(source, target)
+            os.remove(path)
+        except Exception as e:
+            print(f"Error compressing log file {path}: {e}", file=sys.stderr)
+
+    def _cleanup_old_logs(self, log_path: str, base_name: str, ext: str) -> None:
+        """Delete rotated files of a log beyond the retention count or age"""
+        try:
+            pattern = re.compile(ROTATED_PREFIX_PATTERN.pattern + re.escape(base_name + ext) + r"(\.gz)?$")
+
+            # Rotated files of this log, newest first
+            rotated = []
+            for file_name in os.listdir(log_path):
+                if pattern.match(file_name):
+                    file_path = os.path.join(log_path, file_name)
+                    rotated.append((os.path.getmtime(file_path), file_path))
+            rotated.sort(reverse=True)
+
+            max_age = self.retention_days * 86400
+            now = time.time()
+
+            for index, (mtime, file_path) in enumerate(rotated):
+                if (self.retention_count and index >= self.retention_count) or (
+                    max_age and now - mtime > max_age
+                ):
+                    os.remove(file_path)
+
+        except Exception as e:
+            # If cleanup fails, just continue
+            print(f"Error cleaning up old logs: {e}", file=sys.stderr)
+            print(traceback.format_exc(), file=sys.stderr)
+
+_log_writer: Optional[LogWriter] = None
+_log_maintenance: Optional[LogMaintenance] = None
+_log_writer_lock = threading.Lock()
+
+def get_log_writer() -> LogWriter:
+    """Get the process-wide log writer, starting it on first use"""
+    global _log_writer, _log_maintenance
+
+    if _log_writer is None:
+        with _log_writer_lock:
+            if _log_writer is None:
+                writer = LogWriter()
+                _log_maintenance = LogMaintenance(writer)
+                atexit.register(writer.flush)
+                metrics.register_gauge(
+                    "crs_log_queue_depth", "Log records waiting for the writer thread", lambda: writer.queue_depth
+                )
+                _log_writer = writer
+
+    return _log_writer
+
+def configure_log_rotation(
+    max_size: int = MAX_LOG_FILE_SIZE,
+    rotate_interval: int = 0,
+    compress: bool = False,
+    retention_count: int = 0,
+    retention_days: int = 30,
+) -> None:
+    """
+    Configure rotation and retention of all log files
+
+    Args:
+        max_size: Size in bytes after which a log file is rotated (0 = never)
+        rotate_interval: Seconds after which a log file is rotated (0 = size only)
+        compress: Whether rotated files are gzipped
+        retention_count: Rotated files kept per log (0 = unlimited)
+        retention_days: Days rotated files are kept (0 = forever)
+    """
+    writer = get_log_writer()
+    writer.max_size = max_size
+    _log_maintenance.configure(rotate_interval, compress, retention_count, retention_days)
+
+# Log paths whose write access was checked
+_checked_log_paths = set()
+_checked_log_paths_lock = threading.Lock()
+
+def _check_log_path(log_path: str) -> None:
+    """
+    Create the log directory and test write access, once per path
+
+    Args:
+        log_path: Path to log files
+    """
+    with _checked_log_paths_lock:
+        if log_path in _checked_log_paths:
+            return
+        _checked_log_paths.add(log_path)
+
         try:
             # Create log directory if it doesn't exist
             if not os.path.exists(log_path):
                 os.makedirs(log_path, exist_ok=True)
                 print(f"Created log directory: {log_path}", file=sys.stdout)
-                
+
             # Test write access by writing a small test file
             test_file = os.path.join(log_path, ".test_write_access")
             with open(test_file, "w") as f:
@@ -40,123 +515,179 @@ class Logger:
             print(f"Log path: {log_path}", file=sys.stderr)
             print(traceback.format_exc(), file=sys.stderr)
             # Don't raise the exception, continue with warnings
+
+class Logger:
+    """Logger class for handling log files"""
+    
+    def __init__(self, log_path: str, log_filename: Optional[str] = None):
+        """
+        Initialize the logger
+        
+        Args:
+            log_path: Path to log files
+            log_filename: Optional specific log file name (defaults to CloudReportLog.txt)
+        """
+        self.log_path = log_path
+        self.log_filename = log_filename or "CloudReportLog.txt"
+        self.writer = get_log_writer()
+        
+        _check_log_path(log_path)
     
     def log(self, message: str, include_timestamp: bool = True) -> None:
         """
         Log a message to the log file
         
+        The message is queued for the background writer thread; no file
+        I/O happens on the caller's thread.
+        
         Args:
             message: Message to log
             include_timestamp: Whether to include timestamp in log
         """
-        with self.lock:
+        # Format timestamp if needed
+        timestamp = ""
+        if include_timestamp:
+            timestamp = f"{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} "
+
+        self.writer.enqueue(os.path.join(self.log_path, self.log_filename), f"{timestamp}{message}\n")
+
+    def _log_level_message(self, level: int, level_name: str, message: str, args: tuple) -> None:
+        """Format and log a message if its level is enabled"""
+        if level < _log_level:
+            return
+
+        if args:
             try:
-                log_file_path = os.path.join(self.log_path, self.log_filename)
-                
-                # Check if log file exists and its size
-                if os.path.exists(log_file_path):
-                    file_size = os.path.getsize(log_file_path)
-                    if file_size > 500 * 1024:  # 500 KB max size
-                        self._rotate_log_file(log_file_path)
-                
-                # Format timestamp if needed
-                timestamp = ""
-                if include_timestamp:
-                    timestamp = f"{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]} "
-                
-                # Ensure log directory exists
-                os.makedirs(self.log_path, exist_ok=True)
-                
-                # Write to log file
-                with open(log_file_path, "a", encoding="utf-8") as f:
-                    f.write(f"{timestamp}{message}\n")
-            
-            except Exception as e:
-                # If we can't log, print to stderr
-                print(f"Error writing to log: {e}", file=sys.stderr)
-                print(f"Message: {message}", file=sys.stderr)
-                print(f"Log path: {self.log_path}", file=sys.stderr)
-                print(f"Log file: {self.log_filename}", file=sys.stderr)
-                print(traceback.format_exc(), file=sys.stderr)
-    
-    def _rotate_log_file(self, log_file_path: str) -> None:
+                message = message % args
+            except (TypeError, ValueError) as e:
+                message = f"{message} {args!r} (format error: {e})"
+
+        self.log(f"[{level_name}] {message}")
+
+    def debug(self, message: str, *args: Any) -> None:
         """
-        Rotate log file when it gets too large
-        
+        Log a debug message
+
+        The message is %-formatted with args only when DEBUG is enabled,
+        so callers pass arguments instead of pre-formatted strings.
+
         Args:
-            log_file_path: Path to log file
+            message: Message, optionally with %-style placeholders
+            *args: Values for the placeholders
         """
-        try:
-            # Create new filename with timestamp
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            base_name, ext = os.path.splitext(os.path.basename(log_file_path))
-            new_filename = f"{timestamp}_{base_name}{ext}"
-            new_path = os.path.join(self.log_path, new_filename)
-            
-            # Rename existing file
-            os.rename(log_file_path, new_path)
-            
-            # Delete old log files (keep last 30 days)
-            self._cleanup_old_logs()
-            
-        except Exception as e:
-            # If rotation fails, just continue
-            print(f"Error rotating log file: {e}", file=sys.stderr)
-            print(traceback.format_exc(), file=sys.stderr)
-    
-    def _cleanup_old_logs(self) -> None:
-        """Clean up old log files (older than 30 days)"""
-        try:
-            # Get current time
-            now = datetime.datetime.now()
-            max_age = datetime.timedelta(days=30)
-            
-            # Get list of log files
-            base_name, ext = os.path.splitext(os.path.basename(self.log_filename))
-            
-            # Iterate over log files
-            for file_name in os.listdir(self.log_path):
-                if file_name.endswith(ext) and file_name.find(base_name) > 0:
-                    file_path = os.path.join(self.log_path, file_name)
-                    
-                    # Check file age
-                    file_time = datetime.datetime.fromtimestamp(os.path.getmtime(file_path))
-                    if now - file_time > max_age:
-                        # Delete old file
-                        os.remove(file_path)
-        
-        except Exception as e:
-            # If cleanup fails, just continue
-            print(f"Error cleaning up old logs: {e}", file=sys.stderr)
-            print(traceback.format_exc(), file=sys.stderr)
+        self._log_level_message(DEBUG, "DEBUG", message, args)
+
+    def info(self, message: str, *args: Any) -> None:
+        """Log an info message (see debug())"""
+        self._log_level_message(INFO, "INFO", message, args)
+
+    def warning(self, message: str, *args: Any) -> None:
+        """Log a warning message (see debug())"""
+        self._log_level_message(WARNING, "WARNING", message, args)
+
+    def error(self, message: str, *args: Any) -> None:
+        """Log an error message (see debug())"""
+        self._log_level_message(ERROR, "ERROR", message, args)
     
     def log_trace(self, method_name: str, messages: List[str]) -> None:
         """
-        Log trace information with method name and messages
+        Log trace information with method name and messages to TraceLog_Server.txt
         
         Args:
             method_name: Name of the method
             messages: List of messages to log
         """
-        with self.lock:
-            try:
-                # Save original filename
-                original_filename = self.log_filename
-                
-                # Set trace log filename
-                self.log_filename = "TraceLog_Server.txt"
-                
-                # Log method name and messages
-                timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                self.log(f"[{timestamp}] {method_name}", include_timestamp=False)
-                
-                for message in messages:
-                    self.log(f"  {message}", include_timestamp=False)
-                
-                # Restore original filename
-                self.log_filename = original_filename
-            
-            except Exception as e:
-                # If trace logging fails, just print to stderr
-                print(f"Error writing to trace log: {e}", file=sys.stderr)
-                print(traceback.format_exc(), file=sys.stderr) 
\ No newline at end of file
+        get_trace_logger(self.log_path).trace(method_name, messages)
+
+class TraceLogger(Logger):
+    """
+    Logger for TraceLog_Server.txt
+
+    Used only when TraceLogEnabled is set; callers keep None instead of a
+    TraceLogger otherwise, so tracing costs a single check when disabled.
+    """
+
+    def __init__(self, log_path: str):
+        """
+        Initialize the trace logger
+
+        Args:
+            log_path: Path to log files
+        """
+        super().__init__(log_path, TRACE_LOG_FILENAME)
+
+    def trace(self, method_name: str, messages: List[str]) -> None:
+        """
+        Log a method name and messages as one block
+
+        Args:
+            method_name: Name of the method
+            messages: List of messages to log
+        """
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        lines = [f"[{timestamp}] {method_name}"]
+        lines.extend(f"  {message}" for message in messages)
+        self.log("\n".join(lines), include_timestamp=False)
+
+    def enter(self, method_name: str, context: str = "") -> None:
+        """
+        Log entering a method
+
+        Args:
+            method_name: Name of the method
+            context: Optional context (e.g. client ID)
+        """
+        self.log(f"> {method_name} {context}")
+
+    def exit(self, method_name: str, elapsed: float, context: str = "") -> None:
+        """
+        Log leaving a method with its duration
+
+        Args:
+            method_name: Name of the method
+            elapsed: Seconds spent in the method
+            context: Optional context (e.g. client ID)
+        """
+        self.log(f"< {method_name} {context} {elapsed * 1000:.3f} ms")
+
+# Shared loggers, keyed by (log path, log filename)
+_loggers: Dict[Tuple[str, str], Logger] = {}
+_loggers_lock = threading.Lock()
+
+def get_logger(log_path: str, log_filename: Optional[str] = None) -> Logger:
+    """
+    Get the shared logger for a log file, creating it on first use
+
+    Args:
+        log_path: Path to log files
+        log_filename: Optional specific log file name (defaults to CloudReportLog.txt)
+
+    Returns:
+        Logger shared by all callers logging to the same file
+    """
+    key = (log_path, log_filename or "CloudReportLog.txt")
+
+    logger = _loggers.get(key)
+    if logger is None:
+        with _loggers_lock:
+            logger = _loggers.get(key)
+            if logger is None:
+                if key[1] == TRACE_LOG_FILENAME:
+                    logger = TraceLogger(log_path)
+                else:
+                    logger = Logger(*key)
+                _loggers[key] = logger
+
+    return logger
+
+def get_trace_logger(log_path: str) -> TraceLogger:
+    """
+    Get the shared trace logger (TraceLog_Server.txt) for a log path
+
+    Args:
+        log_path: Path to log files
+
+    Returns:
+        Shared TraceLogger
+    """
+    return get_logger(log_path, TRACE_LOG_FILENAME)
@@ -0,0 +1,279 @@
+"""
+Metrics module for Cloud Report Server
+"""
+
+import bisect
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Commands with their own label value; anything else is counted as OTHER
+TCP_COMMANDS = frozenset(("INIT", "INFO", "PING", "GREQ", "SRSP", "VERS", "DWNL", "ERRL"))
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format label names and values as {name="value",...}"""
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+def _format_value(value: float) -> str:
+    """Format a sample value without losing precision"""
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class Counter:
+    """Monotonic counter, recorded into the per-thread shard of its registry"""
+
+    kind = "counter"
+
+    def __init__(self, registry: "MetricsRegistry", name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.registry = registry
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+
+    def inc(self, *labels: str, value: float = 1) -> None:
+        """
+        Increment the counter
+
+        Args:
+            *labels: Label values, in the order of label_names
+            value: Amount to add
+        """
+        shard = self.registry.get_shard()
+        key = (self.name, labels)
+        values = shard.get(key)
+        if values is None:
+            shard[key] = [value]
+        else:
+            values[0] += value
+
+    def new_values(self) -> List[float]:
+        """Get empty aggregation values"""
+        return [0]
+
+    def render(self, samples: Dict[Tuple[str, ...], List[float]]) -> List[str]:
+        """Render aggregated samples in Prometheus text format"""
+        return [
+            f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(values[0])}"
+            for labels, values in sorted(samples.items())
+        ]
+
+class Histogram(Counter):
+    """Histogram of observed values, recorded into the per-thread shard of its registry"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(registry, name, help_text, label_names)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Record an observation
+
+        Args:
+            value: Observed value (seconds for latencies)
+            *labels: Label values, in the order of label_names
+        """
+        shard = self.registry.get_shard()
+        key = (self.name, labels)
+        values = shard.get(key)
+        if values is None:
+            values = self.new_values()
+            shard[key] = values
+
+        # One count per bucket (last one is +Inf), then the sum
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def new_values(self) -> List[float]:
+        """Get empty aggregation values"""
+        return [0] * (len(self.buckets) + 2)
+
+    def render(self, samples: Dict[Tuple[str, ...], List[float]]) -> List[str]:
+        """Render aggregated samples in Prometheus text format"""
+        lines = []
+        bucket_label_names = self.label_names + ("le",)
+
+        for labels, values in sorted(samples.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values[:-1]):
+                cumulative += count
+                le = bound if isinstance(bound, str) else f"{bound:g}"
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_label_names, labels + (le,))} {_format_value(cumulative)}")
+
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(values[-1])}")
+            lines.append(f"{self.name}_count{label_text} {_format_value(cumulative)}")
+
+        return lines
+
+class MetricsRegistry:
+    """
+    Registry of counters, histograms and gauges exposed by /metrics
+
+    Counters and histograms are recorded into a shard owned by the calling
+    thread, so recording never takes a lock or contends with a scrape. A
+    scrape sums the shards; shards of threads that have ended are folded
+    into a retired total. Gauges are read from callbacks at scrape time.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry"""
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.shards: List[Tuple[threading.Thread, Dict[Tuple[str, Tuple[str, ...]], List[float]]]] = []
+        self.retired: Dict[Tuple[str, Tuple[str, ...]], List[float]] = {}
+        self.metrics: Dict[str, Counter] = {}
+
+        # name -> (help text, label names, {label values: callback})
+        self.gauges: Dict[str, Tuple[str, Tuple[str, ...], Dict[Tuple[str, ...], Callable[[], float]]]] = {}
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        """Define a counter"""
+        metric = Counter(self, name, help_text, label_names)
+        self.metrics[name] = metric
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Define a histogram"""
+        metric = Histogram(self, name, help_text, label_names, buckets)
+        self.metrics[name] = metric
+        return metric
+
+    def register_gauge(
+        self,
+        name: str,
+        help_text: str,
+        callback: Callable[[], float],
+        labels: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """
+        Register a gauge read from a callback at scrape time
+
+        Args:
+            name: Metric name
+            help_text: Metric description
+            callback: Function returning the current value
+            labels: Optional labels of this gauge series (replaces a series with the same labels)
+        """
+        labels = labels or {}
+        with self.lock:
+            _, _, series = self.gauges.setdefault(name, (help_text, tuple(labels), {}))
+            series[tuple(labels.values())] = callback
+
+    def get_shard(self) -> Dict[Tuple[str, Tuple[str, ...]], List[float]]:
+        """Get the calling thread's shard, creating it on first use"""
+        shard = getattr(self.local, "shard", None)
+        if shard is None:
+            shard = {}
+            self.local.shard = shard
+            with self.lock:
+                self.shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _merge(self, totals: Dict[Tuple[str, Tuple[str, ...]], List[float]], shard: Dict) -> None:
+        """Add the values of a shard to totals"""
+        # list() copies the items in one step, safe while the owner thread inserts
+        for key, values in list(shard.items()):
+            target = totals.get(key)
+            if target is None:
+                totals[key] = list(values)
+            else:
+                for index, value in enumerate(values):
+                    target[index] += value
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format
+
+        Returns:
+            Metrics text
+        """
+        with self.lock:
+            live_shards = []
+            for thread, shard in self.shards:
+                if thread.is_alive():
+                    live_shards.append((thread, shard))
+                else:
+                    self._merge(self.retired, shard)
+            self.shards = live_shards
+
+            totals: Dict[Tuple[str, Tuple[str, ...]], List[float]] = {}
+            self._merge(totals, self.retired)
+            gauges = {name: (help_text, names, dict(series)) for name, (help_text, names, series) in self.gauges.items()}
+
+        for _, shard in live_shards:
+            self._merge(totals, shard)
+
+        # Group samples by metric
+        samples: Dict[str, Dict[Tuple[str, ...], List[float]]] = {}
+        for (name, labels), values in totals.items():
+            samples.setdefault(name, {})[labels] = values
+
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.help_text}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render(samples.get(name, {})))
+
+        for name, (help_text, label_names, series) in gauges.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for label_values, callback in sorted(series.items()):
+                try:
+                    value = callback()
+                except Exception:
+                    continue
+                lines.append(f"{name}{_format_labels(label_names, label_values)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+# Metrics of this process, exposed by HttpServer at /metrics
+metrics = MetricsRegistry()
+
+tcp_command_duration = metrics.histogram(
+    "crs_tcp_command_duration_seconds", "Time spent handling a TCP command", ("command",)
+)
+report_duration = metrics.histogram(
+    "crs_http_report_duration_seconds", "Time until a /report request was answered by the client"
+)
+report_timeouts = metrics.counter(
+    "crs_http_report_timeouts_total", "/report requests the client did not answer in time"
+)
+report_busy = metrics.counter(
+    "crs_http_report_busy_total", "/report requests rejected because the client was busy or unreachable"
+)
+report_cancelled = metrics.counter(
+    "crs_http_report_cancelled_total", "/report requests cancelled because the HTTP caller disconnected"
+)
+decode_failures = metrics.counter(
+    "crs_decode_failures_total", "Payloads that could not be decoded, by failed stage", ("stage",)
+)
+decode_plain_fallbacks = metrics.counter(
+    "crs_decode_plain_fallbacks_total", "Payloads no decompression strategy accepted, decoded as plain text"
+)
+auth_request_duration = metrics.histogram(
+    "crs_auth_request_duration_seconds", "Authentication server request latency", ("result",)
+)
@@ -0,0 +1,152 @@
+"""
+Idle connection reaper for Cloud Report Server
+"""
+
+import heapq
+import itertools
+import sys
+import threading
+import time
+import traceback
+from typing import Any, Callable, List, Set, Tuple
+
+from constants import DROP_DEVICE_WITHOUT_ACTIVITY_SEC, DROP_DEVICE_WITHOUT_SERIAL_TIME_SEC
+
+class ConnectionReaper:
+    """
+    Closes idle and unidentified connections when their deadline passes
+
+    Every accepted connection is tracked in a heap ordered by its next
+    deadline: unidentified_timeout after accept until the client sends its
+    ID, and idle_timeout after its last command. Each tick pops only the
+    entries that are due. An entry whose connection was active since it
+    was scheduled is pushed again with its new deadline, so a tick costs
+    O(due entries * log n) instead of a scan of all connections. Times are
+    taken from time.monotonic().
+    """
+
+    def __init__(
+        self,
+        on_expire: Callable[[Any, str], None],
+        idle_timeout: float = DROP_DEVICE_WITHOUT_ACTIVITY_SEC,
+        unidentified_timeout: float = DROP_DEVICE_WITHOUT_SERIAL_TIME_SEC,
+        tick: float = 1.0,
+    ):
+        """
+        Initialize the reaper
+
+        Args:
+            on_expire: Called with (connection, reason) for each expired connection
+            idle_timeout: Seconds without a command before a connection is closed
+            unidentified_timeout: Seconds after accept before a connection without client ID is closed
+            tick: Seconds between checks
+        """
+        self.on_expire = on_expire
+        self.idle_timeout = idle_timeout
+        self.unidentified_timeout = unidentified_timeout
+        self.tick = tick
+
+        self.lock = threading.Lock()
+        self.heap: List[Tuple[float, int, Any]] = []
+        self.tracked: Set[Any] = set()
+        self.sequence = itertools.count()
+
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self) -> None:
+        """Start the reaper thread"""
+        self.stopped.clear()
+        self.thread = threading.Thread(target=self._run, name="connection-reaper", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> List[Any]:
+        """
+        Stop the reaper thread
+
+        Returns:
+            Connections that were still tracked
+        """
+        self.stopped.set()
+        with self.lock:
+            connections = list(self.tracked)
+            self.tracked.clear()
+            self.heap.clear()
+        return connections
+
+    def add(self, connection: Any) -> None:
+        """
+        Track a newly accepted connection
+
+        Args:
+            connection: Connection with connection_info and client_id
+        """
+        deadline, _ = self._deadline(connection)
+        with self.lock:
+            self.tracked.add(connection)
+            heapq.heappush(self.heap, (deadline, next(self.sequence), connection))
+
+    def remove(self, connection: Any) -> None:
+        """
+        Stop tracking a closed connection; its heap entry is dropped when due
+
+        Args:
+            connection: Connection that was closed
+        """
+        with self.lock:
+            self.tracked.discard(connection)
+
+    def _deadline(self, connection: Any) -> Tuple[float, str]:
+        """Get the current deadline of a connection and the reason it would expire"""
+        info = connection.connection_info
+        deadline = info.last_action + self.idle_timeout
+        reason = "inactive"
+
+        if not connection.client_id:
+            unidentified_deadline = info.connect_time + self.unidentified_timeout
+            if unidentified_deadline < deadline:
+                deadline = unidentified_deadline
+                reason = "unidentified"
+
+        return deadline, reason
+
+    def expire_due(self, now: float) -> int:
+        """
+        Expire the connections whose deadline has passed
+
+        Args:
+            now: Current time.monotonic() value
+
+        Returns:
+            Number of connections expired
+        """
+        expired = []
+
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now:
+                _, _, connection = heapq.heappop(self.heap)
+                if connection not in self.tracked:
+                    continue
+
+                deadline, reason = self._deadline(connection)
+                if deadline > now:
+                    # Active since it was scheduled
+                    heapq.heappush(self.heap, (deadline, next(self.sequence), connection))
+                    continue
+
+                self.tracked.discard(connection)
+                expired.append((connection, reason))
+
+        for connection, reason in expired:
+            try:
+                self.on_expire(connection, reason)
+            except Exception as e:
+                print(f"Error expiring connection: {e}", file=sys.stderr)
+                print(traceback.format_exc(), file=sys.stderr)
+
+        return len(expired)
+
+    def _run(self) -> None:
+        """Reaper thread main loop"""
+        while not self.stopped.wait(self.tick):
+            self.expire_due(time.monotonic())
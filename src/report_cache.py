@@ -0,0 +1,180 @@
+"""
+Report result cache for Cloud Report Server
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+
+# Approximate memory of an entry besides its response text
+ENTRY_OVERHEAD = 200
+
+class ReportCache:
+    """
+    Cache of /report results with request coalescing
+
+    Results are keyed by client ID, report name and a hash of the request
+    body, and kept for the TTL of the report. While a request is waiting
+    for the client, identical requests wait for the same result instead
+    of sending their own request to the client, also for reports that are
+    not cached. Failed requests are not cached; their error is passed to
+    the coalesced requests. Entries are
+    evicted least recently used first when max_bytes is exceeded.
+    """
+
+    def __init__(
+        self,
+        default_ttl: float = 0,
+        report_ttls: Optional[Dict[str, float]] = None,
+        max_bytes: int = 64 * 1024 * 1024,
+    ):
+        """
+        Initialize the report cache
+
+        Args:
+            default_ttl: Seconds a result is reused (0 disables caching)
+            report_ttls: TTL per report name (case-insensitive), overriding default_ttl
+            max_bytes: Approximate memory limit of the cached results
+        """
+        self.default_ttl = default_ttl
+        self.report_ttls = {name.lower(): ttl for name, ttl in (report_ttls or {}).items()}
+        self.max_bytes = max_bytes
+
+        # key -> (monotonic expiry time, size, response), least recently used first
+        self.entries: "OrderedDict[Tuple[str, str, bytes], Tuple[float, int, str]]" = OrderedDict()
+        self.size = 0
+        self.in_flight: Dict[Tuple[str, str, bytes], Future] = {}
+        self.waiters: Dict[Tuple[str, str, bytes], int] = {}
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get_ttl(self, report_name: str) -> float:
+        """
+        Get the TTL of a report
+
+        Args:
+            report_name: Report name
+
+        Returns:
+            Seconds a result of this report is reused
+        """
+        return self.report_ttls.get(report_name.lower(), self.default_ttl)
+
+    def get(
+        self,
+        client_id: str,
+        report_name: str,
+        data: str,
+        loader: Callable[[Callable[[], bool]], str],
+        timeout: float,
+    ) -> str:
+        """
+        Get a report result from the cache, the identical request in flight or the loader
+
+        Args:
+            client_id: Client ID
+            report_name: Report name
+            data: Request body
+            loader: Function requesting the report from the client; it is passed a
+                function telling whether other requests are waiting for its result
+            timeout: Seconds to wait for an identical request in flight
+
+        Returns:
+            Client response
+
+        Raises:
+            concurrent.futures.TimeoutError: If the identical request in flight did not finish in time
+            Exception: Whatever the loader raised
+        """
+        ttl = self.get_ttl(report_name)
+        key = (client_id, report_name, hashlib.sha256(data.encode('utf-8')).digest())
+
+        with self.lock:
+            entry = self.entries.get(key) if ttl > 0 else None
+            if entry is not None:
+                if time.monotonic() < entry[0]:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                self._remove(key)
+
+            future = self.in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self.in_flight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+                self.waiters[key] = self.waiters.get(key, 0) + 1
+
+        if not leader:
+            try:
+                return future.result(timeout=timeout)
+            finally:
+                with self.lock:
+                    self.waiters[key] -= 1
+                    if not self.waiters[key]:
+                        del self.waiters[key]
+
+        try:
+            response = loader(lambda: key in self.waiters)
+        except BaseException as e:
+            with self.lock:
+                del self.in_flight[key]
+            future.set_exception(e)
+            raise
+
+        with self.lock:
+            del self.in_flight[key]
+            if ttl > 0:
+                self._store(key, time.monotonic() + ttl, response)
+        future.set_result(response)
+
+        return response
+
+    def _remove(self, key: Tuple[str, str, bytes]) -> None:
+        """Remove an entry (lock held)"""
+        _, size, _ = self.entries.pop(key)
+        self.size -= size
+
+    def _store(self, key: Tuple[str, str, bytes], expires: float, response: str) -> None:
+        """Store a result, evicting least recently used entries over max_bytes (lock held)"""
+        size = len(response) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+
+        if key in self.entries:
+            self._remove(key)
+
+        self.entries[key] = (expires, size, response)
+        self.size += size
+
+        while self.size > self.max_bytes:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with entry count, size and hit/miss counters
+        """
+        with self.lock:
+            return {
+                "Entries": len(self.entries),
+                "Bytes": self.size,
+                "Hits": self.hits,
+                "Misses": self.misses,
+                "Coalesced": self.coalesced,
+                "Evictions": self.evictions,
+            }
@@ -17,8 +17,15 @@ try:
     from config import ServerConfig
     from crypto import check_registration_key
     from http_server import HttpServer
-    from logger import Logger
+    from http_auth import HttpAuthenticator
+    from http_compression import ResponseCompressor
+    from logger import configure_log_rotation, get_logger, set_log_level
+    from admission import AdmissionController, ConnectionLimit
+    from error_log import ErrorLogSink
+    from report_cache import ReportCache
+    from auth_client import AuthClient
     from tcp_server import TcpServer
+    from async_tcp_server import AsyncTcpServer
     print("All modules imported successfully")
 except ImportError as e:
     print(f"Error importing modules: {e}", file=sys.stderr)
@@ -52,7 +59,7 @@ class CloudReportServer:
             print(f"Logs directory created: {self.logs_dir}")
             
             # Initialize logger
-            self.logger = Logger(self.logs_dir)
+            self.logger = get_logger(self.logs_dir)
             self.logger.log("Cloud Report Server starting...")
             print("Logger initialized successfully")
             
@@ -79,6 +86,8 @@ class CloudReportServer:
                         sys.exit(1)
                 
                 self.config = ServerConfig(config_file)
+                set_log_level(self.config.get_log_level())
+                configure_log_rotation(**self.config.get_log_rotation_settings())
                 self.logger.log(f"Configuration loaded from {config_file}")
                 print("Configuration loaded successfully")
             except Exception as e:
@@ -120,21 +129,72 @@ class CloudReportServer:
             server_count = self.config.get_server_count()
             print(f"Server interfaces to initialize: {server_count}")
             
+            # MaxConnections caps the open connections of all interfaces together
+            connection_limit = ConnectionLimit(self.config.get_max_connections())
+            
             for i in range(1, server_count + 1):
                 try:
                     # Get server settings
                     settings = self.config.get_server_settings(i)
                     print(f"Server {i} settings: {settings}")
                     
-                    # Create TCP server
-                    print(f"Creating TCP server {i}...")
-                    tcp_server = TcpServer(
-                        host=settings["tcp_interface"],
-                        port=settings["tcp_port"],
-                        log_path=self.logs_dir,
-                        auth_server_url=settings["auth_server_url"]
+                    # Shared, pooled client for the authentication server
+                    auth_client = AuthClient(
+                        settings["auth_server_url"],
+                        max_concurrent=settings["auth_max_concurrent"],
+                        cache_ttl=settings["auth_cache_ttl"],
+                        timeout=settings["auth_timeout"]
+                    )
+                    
+                    # Admission control for reconnect storms
+                    admission = AdmissionController(
+                        max_connections_per_ip=settings["max_connections_per_ip"],
+                        accept_rate=settings["accept_rate"],
+                        accept_burst=settings["accept_burst"],
+                        connection_limit=connection_limit
                     )
                     
+                    # Rate limited, deduplicated sink for client ERRL messages
+                    error_sink = ErrorLogSink(
+                        self.logs_dir,
+                        rate=settings["errlog_rate"],
+                        burst=settings["errlog_burst"]
+                    )
+                    
+                    # Create TCP server
+                    print(f"Creating TCP server {i} (mode: {settings['tcp_mode']})...")
+                    if settings["tcp_mode"] == "async":
+                        tcp_server = AsyncTcpServer(
+                            host=settings["tcp_interface"],
+                            port=settings["tcp_port"],
+                            log_path=self.logs_dir,
+                            auth_server_url=settings["auth_server_url"],
+                            max_pending_requests=settings["max_pending_requests"],
+                            max_in_flight_requests=settings["max_in_flight_requests"],
+                            max_line_size=settings["max_line_size"],
+                            auth_client=auth_client,
+                            admission=admission,
+                            backlog=settings["tcp_backlog"],
+                            error_sink=error_sink,
+                            trace_log_enabled=settings["trace_log_enabled"],
+                            workers=settings["tcp_workers"]
+                        )
+                    else:
+                        tcp_server = TcpServer(
+                            host=settings["tcp_interface"],
+                            port=settings["tcp_port"],
+                            log_path=self.logs_dir,
+                            auth_server_url=settings["auth_server_url"],
+                            max_pending_requests=settings["max_pending_requests"],
+                            max_in_flight_requests=settings["max_in_flight_requests"],
+                            max_line_size=settings["max_line_size"],
+                            auth_client=auth_client,
+                            admission=admission,
+                            backlog=settings["tcp_backlog"],
+                            error_sink=error_sink,
+                            trace_log_enabled=settings["trace_log_enabled"]
+                        )
+                    
                     # Create HTTP server
                     print(f"Creating HTTP server {i}...")
                     http_server = HttpServer(
@@ -143,7 +203,26 @@ class CloudReportServer:
                         log_path=self.logs_dir,
                         logins=settings["http_logins"],
                         get_client_func=tcp_server.get_client,
-                        get_client_list_func=tcp_server.get_client_list
+                        get_client_list_func=tcp_server.get_client_list,
+                        get_tcp_stats_func=tcp_server.get_stats,
+                        workers=settings["http_workers"],
+                        queue_size=settings["http_queue_size"],
+                        report_timeout=settings["report_timeout"],
+                        report_cache=ReportCache(
+                            default_ttl=settings["report_cache_ttl"],
+                            report_ttls=settings["report_cache_ttls"],
+                            max_bytes=settings["report_cache_size"],
+                        ),
+                        compressor=ResponseCompressor(
+                            level=settings["compression_level"],
+                            threshold=settings["compression_threshold"],
+                        ),
+                        authenticator=HttpAuthenticator(
+                            settings["http_logins"],
+                            max_failures=settings["auth_max_failures"],
+                            max_backoff=settings["auth_max_backoff"],
+                            cache_ttl=settings["auth_verified_ttl"],
+                        ),
                     )
                     
                     self.tcp_servers.append(tcp_server)
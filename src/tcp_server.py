@@ -11,20 +11,40 @@ import traceback
 from typing import Dict, List, Optional, Tuple, Any
 
 from constants import (
-    DROP_DEVICE_WITHOUT_ACTIVITY_SEC,
-    DROP_DEVICE_WITHOUT_SERIAL_TIME_SEC,
+    CLIENT_LIST_REFRESH_SEC,
     LINE_SEPARATOR,
+    MAX_LINE_SIZE,
     RESPONSE_OK,
     TCP_ERR_COMMAND_UNKNOWN,
     TCP_ERR_DUPLICATE_CLIENT_ID,
 )
-from connection import TCPConnection, TCPCommandHandler
-from logger import Logger
+from admission import AdmissionController, reject_socket
+from auth_client import AuthClient
+from connection import TCPConnection, TCPCommandHandler, wall_clock
+from error_log import ErrorLogSink
+from framing import Frame, LineFramer, LineTooLongError
+from logger import get_logger, get_trace_logger
+from metrics import metrics
+from reaper import ConnectionReaper
 
 class TcpServer:
     """TCP server implementation"""
     
-    def __init__(self, host: str, port: int, log_path: str, auth_server_url: str):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        log_path: str,
+        auth_server_url: str,
+        max_pending_requests: int = 8,
+        max_in_flight_requests: int = 1,
+        max_line_size: int = MAX_LINE_SIZE,
+        auth_client: Optional[AuthClient] = None,
+        admission: Optional[AdmissionController] = None,
+        backlog: int = 128,
+        error_sink: Optional[ErrorLogSink] = None,
+        trace_log_enabled: bool = False,
+    ):
         """
         Initialize the TCP server
         
@@ -33,23 +53,52 @@ class TcpServer:
             port: Port to bind to
             log_path: Path to log files
             auth_server_url: URL of the authentication server
+            max_pending_requests: Report requests queued per client before rejecting
+            max_in_flight_requests: Report requests sent to a client before waiting for SRSP
+            max_line_size: Maximum length of a command line in bytes
+            auth_client: Shared authentication server client (created from auth_server_url if not given)
+            admission: Admission control for new connections (unlimited if not given)
+            backlog: Listen backlog of the server socket
+            error_sink: Sink for client ERRL messages (default limits if not given)
+            trace_log_enabled: Whether command timings are written to TraceLog_Server.txt
         """
         self.host = host
         self.port = port
         self.log_path = log_path
         self.auth_server_url = auth_server_url
-        self.logger = Logger(log_path)
+        self.max_pending_requests = max_pending_requests
+        self.max_in_flight_requests = max_in_flight_requests
+        self.max_line_size = max_line_size
+        self.auth_client = auth_client or AuthClient(auth_server_url)
+        self.admission = admission or AdmissionController()
+        self.backlog = backlog
+        self.error_sink = error_sink or ErrorLogSink(log_path)
+        self.logger = get_logger(log_path)
+        self.trace_logger = get_trace_logger(log_path) if trace_log_enabled else None
         
-        # Active connections
+        # Active connections. The dict is never modified in place: writers
+        # replace it with a changed copy under connections_lock, so readers
+        # use whichever version they see without taking the lock.
         self.connections: Dict[str, TCPConnection] = {}
         self.connections_lock = threading.Lock()
         
+        # (connections dict, build time, client list) of the last get_client_list()
+        self.client_list_snapshot: Tuple[Optional[Dict[str, TCPConnection]], float, List[Dict[str, str]]] = (None, 0.0, [])
+        metrics.register_gauge(
+            "crs_tcp_clients",
+            "Identified clients connected per TCP interface",
+            lambda: len(self.connections),
+            {"interface": f"{host}:{port}"},
+        )
+        
         # Server socket
         self.server_socket = None
         
+        # Closes idle and unidentified connections, tracked from accept
+        self.reaper = ConnectionReaper(self._expire_connection)
+        
         # Server thread
         self.server_thread = None
-        self.cleanup_thread = None
         self.running = False
     
     def start(self) -> None:
@@ -68,17 +117,14 @@ class TcpServer:
                 # Bind and listen
                 self.logger.log(f"Binding TCP server to {self.host}:{self.port}")
                 self.server_socket.bind((self.host, self.port))
-                self.server_socket.listen(5)
+                self.server_socket.listen(self.backlog)
                 
                 # Start server thread
                 self.server_thread = threading.Thread(target=self._accept_connections)
                 self.server_thread.daemon = True
                 self.server_thread.start()
                 
-                # Start cleanup thread
-                self.cleanup_thread = threading.Thread(target=self._cleanup_connections)
-                self.cleanup_thread.daemon = True
-                self.cleanup_thread.start()
+                self.reaper.start()
                 
                 self.logger.log(f"TCP server started on {self.host}:{self.port}")
                 
@@ -125,15 +171,14 @@ class TcpServer:
                 self.server_socket.close()
                 self.server_socket = None
             
-            # Close all connections
+            # Close all connections, including those without a client ID
+            for connection in self.reaper.stop():
+                connection.shutdown()
+            
             with self.connections_lock:
-                for connection in list(self.connections.values()):
-                    try:
-                        connection.client_socket.close()
-                    except Exception:
-                        pass
-                
-                self.connections.clear()
+                self.connections = {}
+            
+            self.auth_client.close()
             
             self.logger.log("TCP server stopped")
         except Exception as e:
@@ -144,10 +189,28 @@ class TcpServer:
     
     def _accept_connections(self) -> None:
         """Accept client connections"""
+        # Whether the next connection was already counted as deferred
+        deferring = False
         while self.running:
             try:
+                # Over the accept rate, leave connections in the listen backlog
+                delay = self.admission.acquire_delay()
+                if delay:
+                    if not deferring:
+                        self.admission.record_deferred()
+                        deferring = True
+                    time.sleep(delay)
+                    continue
+                deferring = False
+                
                 # Accept connection
                 client_socket, address = self.server_socket.accept()
+                
+                # Reject over the connection caps before creating any state
+                if not self.admission.try_admit(address[0]):
+                    reject_socket(client_socket)
+                    continue
+                
                 client_socket.settimeout(60)  # Set timeout to 60 seconds
                 
                 # Log new connection
@@ -159,7 +222,12 @@ class TcpServer:
                     args=(client_socket, address),
                     daemon=True
                 )
-                client_thread.start()
+                try:
+                    client_thread.start()
+                except RuntimeError:
+                    self.admission.release(address[0])
+                    reject_socket(client_socket)
+                    raise
                 
             except socket.timeout:
                 # Socket timeout, just continue
@@ -186,41 +254,44 @@ class TcpServer:
         
         try:
             # Create connection object
-            connection = TCPConnection(client_socket, address, self.log_path)
+            connection = TCPConnection(
+                client_socket,
+                address,
+                self.log_path,
+                self.max_pending_requests,
+                self.max_in_flight_requests,
+            )
+            self.reaper.add(connection)
             
             # Create command handler
-            handler = TCPCommandHandler(connection, self.auth_server_url)
+            handler = TCPCommandHandler(
+                connection, self.auth_server_url, self.auth_client, self.error_sink, self.trace_logger
+            )
             
             # Loop until connection is closed
-            buffer = ""
+            framer = LineFramer(self.max_line_size)
             
             while not connection.must_disconnect and self.running:
                 try:
-                    # Receive data
-                    data = client_socket.recv(4096)
-                    
-                    # If no data, client disconnected
-                    if not data:
+                    # Receive data; no data means the client disconnected
+                    if not framer.recv_from(client_socket):
                         break
                     
-                    # Add to buffer
-                    buffer += data.decode('utf-8')
-                    
                     # Process complete commands
-                    while LINE_SEPARATOR in buffer:
-                        # Split command
-                        command, buffer = buffer.split(LINE_SEPARATOR, 1)
-                        
-                        # Process command
-                        response = self._process_command(command, handler)
+                    for frame in framer.frames():
+                        response = self._process_command(frame, handler)
                         
                         # Send response
-                        client_socket.sendall(f"{response}{LINE_SEPARATOR}".encode('utf-8'))
+                        connection.write(f"{response}{LINE_SEPARATOR}".encode('utf-8'))
                 
                 except socket.timeout:
                     # Socket timeout, just continue
                     continue
                 
+                except LineTooLongError as e:
+                    self.logger.log(f"Dropping client {address[0]}:{address[1]}: {e}")
+                    break
+                
                 except Exception as e:
                     # Log error
                     error_msg = f"Error processing client data: {e}"
@@ -244,76 +315,106 @@ class TcpServer:
                 pass
             
             # Remove from connections list if it was added
-            if connection and connection.client_id:
-                with self.connections_lock:
-                    if connection.client_id in self.connections:
-                        del self.connections[connection.client_id]
+            if connection:
+                connection.on_disconnect()
+                self._unregister_connection(connection)
+            
+            self.admission.release(address[0])
             
             # Log disconnection
             self.logger.log(f"Client disconnected from {address[0]}:{address[1]}")
     
-    def _process_command(self, command: str, handler: TCPCommandHandler) -> str:
+    def _unregister_connection(self, connection: TCPConnection) -> None:
+        """
+        Remove a closed connection from the connections list
+        
+        Args:
+            connection: Connection that was closed
+        """
+        self.reaper.remove(connection)
+        
+        if connection.client_id:
+            with self.connections_lock:
+                if self.connections.get(connection.client_id) is connection:
+                    connections = dict(self.connections)
+                    del connections[connection.client_id]
+                    self.connections = connections
+            
+            self.error_sink.close_client(connection.client_id)
+    
+    def _drop_connection(self, connection: TCPConnection) -> None:
+        """
+        Mark a connection for disconnection and shut down its socket
+        
+        Shutting down wakes up the client thread or task reading from it,
+        which then closes and unregisters the connection.
+        
+        Args:
+            connection: Connection to drop
+        """
+        connection.must_disconnect = True
+        connection.shutdown()
+    
+    def _expire_connection(self, connection: TCPConnection, reason: str) -> None:
+        """
+        Drop a connection whose reaper deadline has passed
+        
+        Args:
+            connection: Expired connection
+            reason: "inactive" or "unidentified"
+        """
+        if reason == "unidentified":
+            self.logger.log(f"Disconnecting unauthenticated client from {connection.connection_info.remote_ip}")
+        else:
+            self.logger.log(f"Disconnecting inactive client: {connection.client_id or connection.connection_info.remote_ip}")
+        
+        self._drop_connection(connection)
+    
+    def _process_command(self, frame: Frame, handler: TCPCommandHandler) -> str:
         """
         Process a command from a client
         
         Args:
-            command: Command string
+            frame: Parsed command line
             handler: Command handler
             
         Returns:
             Response string
         """
         try:
-            print(f"Received command: {command}")
-            
-            # Parse command and parameters
-            parts = command.split()
+            self.logger.debug("Received command: %s", frame.line)
             
-            if not parts:
-                print("Empty command received")
+            if not frame.command:
+                self.logger.debug("Empty command received")
                 return f"{TCP_ERR_COMMAND_UNKNOWN} Empty command"
             
-            cmd = parts[0].upper()
-            print(f"Command type: {cmd}")
-            
-            # Parse parameters (format: key=value)
-            params = {}
-            for part in parts[1:]:
-                if "=" in part:
-                    key, value = part.split("=", 1)
-                    params[key] = value
-            
-            print(f"Command parameters: {params}")
-            
             # Handle client identification
             connection = handler.connection
             
             # If client ID is set, add to connections list
             if connection.client_id and connection.client_id not in self.connections:
-                print(f"New client ID: {connection.client_id}")
                 with self.connections_lock:
                     # Check for duplicate client ID
                     if connection.client_id in self.connections:
                         # Another connection with the same ID exists
                         # Force disconnect both connections
                         other_conn = self.connections[connection.client_id]
-                        other_conn.must_disconnect = True
+                        self._drop_connection(other_conn)
                         connection.must_disconnect = True
                         
                         error_msg = f"Duplicate client ID: {connection.client_id}"
-                        print(f"ERROR: {error_msg}")
-                        self.logger.log(error_msg)
+                        self.logger.warning(error_msg)
                         return f"{TCP_ERR_DUPLICATE_CLIENT_ID} {error_msg}"
                     
                     # Add to connections list
-                    self.connections[connection.client_id] = connection
-                    print(f"Added client ID {connection.client_id} to connections list")
+                    connections = dict(self.connections)
+                    connections[connection.client_id] = connection
+                    self.connections = connections
                     self.logger.log(f"New client connected with ID: {connection.client_id}")
             
             # Handle command
-            print(f"Executing command: {cmd}")
-            response = handler.handle_command(command, params)
-            print(f"Command response: {response[:100]}" + ("..." if len(response) > 100 else ""))
+            response = handler.handle_command(frame)
+            self.logger.debug("Command %s response: %.100s", frame.command, response)
             
             return response
             
@@ -327,34 +428,6 @@ class TcpServer:
             # Return error
             return f"{TCP_ERR_COMMAND_UNKNOWN} {str(e)}"
     
-    def _cleanup_connections(self) -> None:
-        """Clean up inactive connections"""
-        while self.running:
-            try:
-                # Sleep for a while
-                time.sleep(30)
-                
-                # Check all connections
-                with self.connections_lock:
-                    for client_id, connection in list(self.connections.items()):
-                        # Check if connection is inactive
-                        if connection.idle_time_sec > DROP_DEVICE_WITHOUT_ACTIVITY_SEC:
-                            # Disconnect client
-                            connection.must_disconnect = True
-                            self.logger.log(f"Disconnecting inactive client: {client_id}")
-                        
-                        # Check if client ID is set
-                        if not connection.client_id and connection.connected_time_sec > DROP_DEVICE_WITHOUT_SERIAL_TIME_SEC:
-                            # Disconnect client
-                            connection.must_disconnect = True
-                            self.logger.log(f"Disconnecting unauthenticated client from {connection.connection_info.remote_ip}")
-            
-            except Exception as e:
-                error_msg = f"Error cleaning up connections: {e}"
-                self.logger.log(error_msg)
-                print(error_msg, file=sys.stderr)
-                print(traceback.format_exc(), file=sys.stderr)
-    
     def get_client(self, client_id: str) -> Optional[TCPConnection]:
         """
         Get a client by ID
@@ -365,27 +438,50 @@ class TcpServer:
         Returns:
             Client connection if found, None otherwise
         """
-        with self.connections_lock:
-            return self.connections.get(client_id)
+        return self.connections.get(client_id)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get TCP server statistics
+        
+        Returns:
+            Dictionary with the number of identified clients, admission and error log counters
+        """
+        return {
+            "Clients": len(self.connections),
+            "Admission": self.admission.get_stats(),
+            "ErrLog": self.error_sink.get_stats(),
+        }
     
     def get_client_list(self) -> List[Dict[str, str]]:
         """
         Get a list of connected clients
         
+        The list is rebuilt from the current connections without taking
+        connections_lock, at most once per CLIENT_LIST_REFRESH_SEC unless
+        clients connected or disconnected. Callers must not modify it; the
+        same list object is returned while it is current.
+        
         Returns:
             List of client information
         """
-        result = []
+        connections = self.connections
+        snapshot_connections, built_at, result = self.client_list_snapshot
+        now = time.monotonic()
+        
+        if snapshot_connections is connections and now - built_at < CLIENT_LIST_REFRESH_SEC:
+            return result
         
-        with self.connections_lock:
-            for client_id, connection in self.connections.items():
-                result.append({
-                    "Id": client_id,
-                    "Host": connection.client_host,
-                    "Name": connection.client_name,
-                    "Conn": connection.connection_info.connect_time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "Act": connection.connection_info.last_action.strftime("%Y-%m-%d %H:%M:%S"),
-                    "Idle": str(connection.idle_time_sec)
-                })
+        result = []
+        for client_id, connection in connections.items():
+            result.append({
+                "Id": client_id,
+                "Host": connection.client_host,
+                "Name": connection.client_name,
+                "Conn": wall_clock(connection.connection_info.connect_time).strftime("%Y-%m-%d %H:%M:%S"),
+                "Act": wall_clock(connection.connection_info.last_action).strftime("%Y-%m-%d %H:%M:%S"),
+                "Idle": str(connection.idle_time_sec)
+            })
         
-        return result 
\ No newline at end of file
+        self.client_list_snapshot = (connections, now, result)
+        return result
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for TCP line framing
+"""
+
+import os
+import socket
+import sys
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from framing import LineFramer, LineTooLongError
+
+def receive_lines(framer: LineFramer, client_end: socket.socket, count: int) -> list:
+    """Receive until count lines are complete"""
+    lines = []
+    while len(lines) < count:
+        assert framer.recv_from(client_end), "peer closed before the lines were complete"
+        lines.extend(framer.lines())
+    return lines
+
+def test_line_split_across_recv_calls():
+    """A line and its separator may arrive over several recv calls"""
+    peer, sock = socket.socketpair()
+    framer = LineFramer(1024, recv_size=4)
+
+    peer.sendall(b"SRSP CMD=1 DATA=abc\r")
+    peer.sendall(b"\nPING\r\n")
+    frames = []
+    while len(frames) < 2:
+        assert framer.recv_from(sock)
+        frames.extend(framer.frames())
+
+    assert frames[0].command == "SRSP"
+    assert frames[0].params == {"CMD": "1", "DATA": "abc"}
+    assert frames[1].command == "PING"
+    assert not framer.pending
+
+def test_several_lines_in_one_recv():
+    """Lines received together are yielded in order"""
+    peer, sock = socket.socketpair()
+    framer = LineFramer(1024)
+
+    peer.sendall(b"INIT ID=1\r\nPING\r\nINFO")
+    assert receive_lines(framer, sock, 2) == [b"INIT ID=1", b"PING"]
+    assert framer.pending == b"INFO"
+
+def test_unterminated_line_over_limit():
+    """An unfinished line longer than max_line_size is rejected"""
+    peer, sock = socket.socketpair()
+    framer = LineFramer(16)
+
+    peer.sendall(b"x" * 40)
+    framer.recv_from(sock)
+    try:
+        list(framer.lines())
+        assert False, "oversize line was accepted"
+    except LineTooLongError:
+        pass
+
+def test_complete_line_over_limit():
+    """A complete line longer than max_line_size is rejected"""
+    peer, sock = socket.socketpair()
+    framer = LineFramer(16)
+
+    peer.sendall(b"x" * 20 + b"\r\n")
+    framer.recv_from(sock)
+    try:
+        list(framer.lines())
+        assert False, "oversize line was accepted"
+    except LineTooLongError:
+        pass
+
+def test_line_at_limit():
+    """A line of exactly max_line_size bytes is accepted"""
+    peer, sock = socket.socketpair()
+    framer = LineFramer(16)
+
+    peer.sendall(b"x" * 16 + b"\r\n")
+    assert receive_lines(framer, sock, 1) == [b"x" * 16]
+
+def main():
+    """Run all tests"""
+    tests = [value for name, value in globals().items() if name.startswith("test_") and callable(value)]
+    failed = 0
+    for test in tests:
+        print(f"{test.__name__}:")
+        try:
+            test()
+            print("  ✅ passed")
+        except Exception as e:
+            failed += 1
+            print(f"  ❌ failed: {e!r}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Test script for /report request handling
+Covers late client responses, request coalescing and HTTP caller disconnects
+"""
+
+import os
+import resource
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+import http_server
+from connection import TCPConnection
+from http_server import HttpServer, ReportRequestError
+from report_cache import ReportCache
+
+# Check for a disconnected HTTP caller often so the tests run quickly
+http_server.DISCONNECT_POLL_SEC = 0.02
+
+LOG_PATH = tempfile.mkdtemp(prefix="crs_test_")
+
+def tcp_pair():
+    """Create a connected pair of loopback TCP sockets (server end, client end)"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as listener:
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        client_end = socket.create_connection(listener.getsockname())
+        server_end, _ = listener.accept()
+    return server_end, client_end
+
+def make_connection():
+    """Create a client connection and the socket the client reads its requests from"""
+    server_end, client_end = tcp_pair()
+    client_end.settimeout(5)
+    return TCPConnection(server_end, ("127.0.0.1", 40000), LOG_PATH), client_end
+
+def make_server(report_timeout: float = 5, report_cache: ReportCache = None):
+    """Create an HTTP server that is not started"""
+    server = HttpServer("127.0.0.1", 0, LOG_PATH, {}, lambda client_id: None, lambda: [], report_cache=report_cache)
+    server.report_timeout = report_timeout
+    return server
+
+def wait_until(condition, timeout: float = 5.0) -> bool:
+    """Wait until condition() is true"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+def test_late_response_after_timeout_is_dropped():
+    """A SRSP arriving after its request timed out completes nothing"""
+    connection, client_end = make_connection()
+    server = make_server(report_timeout=0.1)
+    server._caller_disconnected = lambda: False
+
+    try:
+        server._request_report(connection, "1", "first", lambda: False)
+        assert False, "request did not time out"
+    except ReportRequestError as e:
+        assert "did not respond in time" in e.message
+    assert client_end.recv(1024) == b"200 CMD=1 DATA=first\r\n"
+    assert not connection.pending_requests
+
+    # The late SRSP is ignored and does not answer the next request
+    assert connection.get_response("1", "late")
+    pending = connection.submit_request("second")
+    assert client_end.recv(1024) == b"200 CMD=2 DATA=second\r\n"
+    assert connection.get_response("2", "ok")
+    assert pending.wait(1) == "ok"
+
+def test_late_response_after_cancel_is_dropped():
+    """A SRSP for a cancelled request frees its slot for the next request only"""
+    connection, client_end = make_connection()
+    first = connection.submit_request("first")
+    second = connection.submit_request("second")
+    assert client_end.recv(1024) == b"200 CMD=1 DATA=first\r\n"
+
+    # Cancelling the request in flight sends the queued one
+    connection.cancel_request(first)
+    assert client_end.recv(1024) == b"200 CMD=2 DATA=second\r\n"
+    assert first.future.cancelled()
+
+    assert connection.get_response("1", "late")
+    assert not second.future.done()
+    assert connection.get_response("2", "ok")
+    assert second.wait(1) == "ok"
+
+def test_failed_send_after_disconnect():
+    """A send failing after a disconnect already failed the request does not raise"""
+    connection, client_end = make_connection()
+
+    class DisconnectingSocket:
+        """Socket whose client disconnects while a request is being sent"""
+
+        def sendall(self, data):
+            connection.fail_pending_requests("Client disconnected")
+            raise OSError("Broken pipe")
+    connection.client_socket = DisconnectingSocket()
+
+    pending = connection.submit_request("first")
+    assert not connection.pending_requests
+    try:
+        pending.wait(1)
+        assert False, "request did not fail"
+    except ConnectionError as e:
+        assert str(e) == "Client disconnected"
+
+def run_coalesced(loader_result, ttl: float = 60):
+    """Run a leader and a coalesced request; return what each of them got and the cache"""
+    cache = ReportCache(default_ttl=ttl)
+    release = threading.Event()
+    results = {}
+
+    def leader_loader(is_shared):
+        release.wait(5)
+        if isinstance(loader_result, Exception):
+            raise loader_result
+        return loader_result
+
+    def follower_loader(is_shared):
+        raise AssertionError("coalesced request called the loader")
+
+    def run(name, loader):
+        try:
+            results[name] = cache.get("1", "sales", "body", loader, 5)
+        except Exception as e:
+            results[name] = e
+
+    leader = threading.Thread(target=run, args=("leader", leader_loader))
+    leader.start()
+    assert wait_until(lambda: cache.in_flight)
+
+    follower = threading.Thread(target=run, args=("follower", follower_loader))
+    follower.start()
+    assert wait_until(lambda: cache.waiters)
+
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert cache.get_stats()["Coalesced"] == 1
+    return results, cache
+
+def test_coalesced_request_gets_leader_result():
+    """A request coalesced with an identical one in flight gets its result"""
+    results, _ = run_coalesced('{"Rows":[]}')
+    assert results["leader"] == results["follower"] == '{"Rows":[]}'
+
+def test_coalescing_without_caching():
+    """Requests are coalesced for reports whose results are not cached"""
+    results, cache = run_coalesced('{"Rows":[]}', ttl=0)
+    assert results["leader"] == results["follower"] == '{"Rows":[]}'
+    assert cache.get_stats()["Entries"] == 0
+
+def test_coalesced_request_gets_leader_error():
+    """A request coalesced with an identical one in flight gets its error"""
+    error = ReportRequestError(104, "Client with ID 1 is busy")
+    results, _ = run_coalesced(error)
+    assert results["leader"] is error
+    assert results["follower"] is error
+
+def test_disconnect_does_not_cancel_shared_request():
+    """The leader's caller going away does not cancel a request others wait for"""
+    connection, client_end = make_connection()
+    cache = ReportCache(default_ttl=60)
+    server = make_server(report_cache=cache)
+    follower_waiting = threading.Event()
+    server._caller_disconnected = follower_waiting.is_set
+    results = {}
+
+    def run(name):
+        try:
+            results[name] = cache.get(
+                "1", "sales", "body",
+                lambda is_shared: server._request_report(connection, "1", "body", is_shared), 5,
+            )
+        except Exception as e:
+            results[name] = e
+
+    leader = threading.Thread(target=run, args=("leader",))
+    leader.start()
+    assert client_end.recv(1024) == b"200 CMD=1 DATA=body\r\n"
+
+    follower = threading.Thread(target=run, args=("follower",))
+    follower.start()
+    assert wait_until(lambda: cache.waiters)
+    follower_waiting.set()
+
+    # Several disconnect checks pass without cancelling the request
+    time.sleep(10 * http_server.DISCONNECT_POLL_SEC)
+    assert "1" in connection.pending_requests
+
+    assert connection.get_response("1", '{"Rows":[]}')
+    leader.join(5)
+    follower.join(5)
+    assert results["leader"] == results["follower"] == '{"Rows":[]}'
+
+def test_disconnect_cancels_unshared_request():
+    """A request nobody else waits for is cancelled when its caller goes away"""
+    connection, client_end = make_connection()
+    server = make_server()
+    server._caller_disconnected = lambda: True
+
+    try:
+        server._request_report(connection, "1", "body", lambda: False)
+        assert False, "request was not cancelled"
+    except ReportRequestError as e:
+        assert e.message == "HTTP caller disconnected"
+    assert not connection.pending_requests
+
+def test_socket_closed_with_high_fd():
+    """Sockets above FD_SETSIZE are checked instead of being taken as closed"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft <= 1500:
+        if hard != resource.RLIM_INFINITY and hard <= 1500:
+            print("  skipped: file descriptor limit too low")
+            return
+        resource.setrlimit(resource.RLIMIT_NOFILE, (2048, hard))
+
+    peer, sock = socket.socketpair()
+    high_fd = os.dup2(sock.fileno(), 1500)
+    sock.close()
+    high_sock = socket.socket(fileno=high_fd)
+
+    try:
+        assert not HttpServer._socket_closed(high_sock)
+
+        # A pipelined request is data, not a disconnect
+        peer.sendall(b"G")
+        assert not HttpServer._socket_closed(high_sock)
+        high_sock.recv(1)
+
+        peer.close()
+        assert HttpServer._socket_closed(high_sock)
+    finally:
+        high_sock.close()
+        peer.close()
+
+def main():
+    """Run all tests"""
+    tests = [value for name, value in globals().items() if name.startswith("test_") and callable(value)]
+    failed = 0
+    for test in tests:
+        print(f"{test.__name__}:")
+        try:
+            test()
+            print("  ✅ passed")
+        except Exception as e:
+            failed += 1
+            print(f"  ❌ failed: {e!r}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())